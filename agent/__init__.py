@@ -1,4 +1,23 @@
 # Agent module
-from .dqn_model import DQN
-from .agent import DQNAgent
-from .replay_buffer import ReplayBuffer
+# Exports are imported on first access (PEP 562), so importing the
+# package - or numpy-only parts such as ReplayBuffer - does not load torch.
+import importlib
+
+_LAZY_EXPORTS = {
+    "DQN": ".dqn_model",
+    "DQNAgent": ".agent",
+    "ReplayBuffer": ".replay_buffer",
+}
+__all__ = list(_LAZY_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _LAZY_EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,188 @@
+"""
+Parallel Actor Pool
+K worker processes collect experience with a synced copy of the policy network
+
+Actors run their own environment, pick epsilon-greedy actions with a local
+network, and stream transition chunks to the learner through a queue.  The
+learner publishes new weights into a shared-memory network; actors copy
+them in whenever the published version changes.
+"""
+
+import copy
+import queue
+
+import numpy as np
+import torch
+import torch.multiprocessing as mp
+
+
+def _actor_loop(actor_id, env_fn, shared_net, weight_lock, weight_version,
+                epsilon, transition_queue, stop_event, max_steps, chunk_size, seed,
+                frame_skip, gamma):
+    """Worker process: run episodes and send transition chunks to the learner"""
+    torch.set_num_threads(1)
+    env_seed = None
+    if seed is not None:
+        env_seed, seed = seed.spawn(2)
+    rng = np.random.default_rng(seed)
+
+    with weight_lock:
+        local_net = copy.deepcopy(shared_net)
+        local_version = weight_version.value
+    local_net.eval()
+
+    env = env_fn()
+    state = env.reset(seed=env_seed)
+    with torch.no_grad():
+        action_size = local_net(torch.from_numpy(state).unsqueeze(0)).shape[1]
+    step = 0
+    chunk = []
+    episodes = []
+
+    while not stop_event.is_set():
+        # Pick up new weights published by the learner
+        if weight_version.value != local_version:
+            with weight_lock:
+                local_net.load_state_dict(shared_net.state_dict())
+                local_version = weight_version.value
+
+        if rng.random() < epsilon.value:
+            action = int(rng.integers(action_size))
+        else:
+            with torch.no_grad():
+                q_values = local_net(torch.from_numpy(state).unsqueeze(0))
+                action = q_values.argmax(dim=1).item()
+
+        if frame_skip > 1:
+            next_state, reward, done, info = env.step_repeat(action, frame_skip, gamma)
+            n_steps = info["n_steps"]
+        else:
+            next_state, reward, done, info = env.step(action)
+            n_steps = 1
+        chunk.append((state, action, reward, next_state, done, n_steps))
+        state = next_state
+
+        if done or step == max_steps - 1:
+            episodes.append((info, step))
+            state = env.reset()
+            step = 0
+        else:
+            step += 1
+
+        if len(chunk) >= chunk_size or episodes:
+            batch = (
+                np.array([t[0] for t in chunk], dtype=np.float32),
+                np.array([t[1] for t in chunk], dtype=np.int64),
+                np.array([t[2] for t in chunk], dtype=np.float32),
+                np.array([t[3] for t in chunk], dtype=np.float32),
+                np.array([t[4] for t in chunk], dtype=bool),
+                np.array([t[5] for t in chunk], dtype=np.int32),
+            )
+            while not stop_event.is_set():
+                try:
+                    transition_queue.put((actor_id, batch, episodes), timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+            chunk = []
+            episodes = []
+
+    env.close()
+
+
+class ActorPool:
+    """
+    Pool of actor processes feeding a single learner
+
+    Usage:
+        pool = ActorPool(env_fn, agent.policy_net, num_actors=8)
+        batch, episodes = pool.get()        # blocks for the next chunk
+        pool.sync_weights(agent.policy_net) # publish new weights
+        pool.set_epsilon(agent.epsilon)
+        pool.close()
+    """
+
+    def __init__(self, env_fn, policy_net: torch.nn.Module, num_actors: int,
+                 epsilon: float = 1.0, max_steps: int = 10000,
+                 chunk_size: int = 64, queue_size: int = 64, seed: int = None,
+                 frame_skip: int = 1, gamma: float = 1.0):
+        """
+        Args:
+            env_fn: Picklable callable returning a headless environment
+                    (e.g. functools.partial(DinoGame, render=False))
+            policy_net: Learner's network; a CPU shared-memory copy is made
+            num_actors: Number of actor processes
+            epsilon: Initial exploration rate
+            max_steps: Maximum steps per actor episode
+            chunk_size: Transitions per queue message
+            queue_size: Maximum pending messages (back-pressure on actors)
+            seed: int or SeedSequence; actor i gets the i-th spawned child
+                  and splits it into independent environment and
+                  exploration seeds (unseeded if None)
+            frame_skip: Frames each action is repeated for (env.step_repeat)
+            gamma: Discount for rewards within a repeated action
+        """
+        ctx = mp.get_context("spawn")
+
+        self.shared_net = copy.deepcopy(policy_net).cpu()
+        self.shared_net.share_memory()
+        self.weight_lock = ctx.Lock()
+        self.weight_version = ctx.Value('l', 0)
+        self.epsilon = ctx.Value('d', epsilon)
+        self.transition_queue = ctx.Queue(maxsize=queue_size)
+        self.stop_event = ctx.Event()
+
+        seeds = [None] * num_actors
+        if seed is not None:
+            if not isinstance(seed, np.random.SeedSequence):
+                seed = np.random.SeedSequence(seed)
+            seeds = seed.spawn(num_actors)
+
+        self.processes = []
+        for actor_id in range(num_actors):
+            process = ctx.Process(
+                target=_actor_loop,
+                args=(actor_id, env_fn, self.shared_net, self.weight_lock,
+                      self.weight_version, self.epsilon, self.transition_queue,
+                      self.stop_event, max_steps, chunk_size,
+                      seeds[actor_id], frame_skip, gamma),
+                daemon=True
+            )
+            process.start()
+            self.processes.append(process)
+
+    def get(self, timeout: float = None):
+        """
+        Receive the next transition chunk from any actor
+
+        Returns:
+            (states, actions, rewards, next_states, dones, n_steps),
+            [(info, steps), ...]
+            where the list holds episodes that finished within the chunk
+        """
+        _, batch, episodes = self.transition_queue.get(timeout=timeout)
+        return batch, episodes
+
+    def sync_weights(self, policy_net: torch.nn.Module):
+        """Publish the learner's current weights to all actors"""
+        with self.weight_lock:
+            self.shared_net.load_state_dict(policy_net.state_dict())
+            self.weight_version.value += 1
+
+    def set_epsilon(self, epsilon: float):
+        """Set the exploration rate used by all actors"""
+        self.epsilon.value = epsilon
+
+    def close(self):
+        """Stop all actors and release their resources"""
+        self.stop_event.set()
+        # Drain so actors blocked on a full queue can exit
+        try:
+            while True:
+                self.transition_queue.get_nowait()
+        except queue.Empty:
+            pass
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
@@ -12,11 +12,14 @@ import torch
 import torch.nn as nn
 import torch.optim as optim
 import numpy as np
-import random
-from typing import Optional
+import threading
+import contextlib
+from typing import Optional, List
 
-from .dqn_model import DQN
+from .dqn_model import DQN, script_network
+from .checkpoint import CheckpointWriter, Deferred, atomic_write, serialize
 from .replay_buffer import ReplayBuffer, PrioritizedReplayBuffer
+from .prefetch import BatchPrefetcher
 
 
 class DQNAgent:
@@ -48,6 +51,15 @@ class DQNAgent:
         per_beta_start: float = 0.4,    # PER importance sampling start
         soft_update: bool = False,      # v6.0: soft target update option
         tau: float = 0.005,             # soft update rate
+        train_every: int = 1,           # env steps between update rounds
+        gradient_steps: int = 1,        # train steps per update round
+        learning_starts: int = 0,       # env steps before the first update
+        fused_forward: bool = False,    # one policy pass over states + next_states, fused Adam
+        compile_model: bool = False,    # compile the loss path (torch.compile / TorchScript)
+        seed=None,                      # int or SeedSequence: network init, exploration, replay
+        buffer_dir: Optional[str] = None,  # memory-mapped replay storage (reopened if present)
+        compact_buffer: bool = False,   # store each observation once (next_state by index)
+        n_step: int = 1,                # transitions per sampled n-step return
         device: str = None
     ):
         self.state_size = state_size
@@ -63,6 +75,10 @@ class DQNAgent:
         self.per_beta = per_beta_start
         self.soft_update = soft_update
         self.tau = tau
+        self.train_every = train_every
+        self.gradient_steps = gradient_steps
+        self.learning_starts = learning_starts
+        self.fused_forward = fused_forward
 
         # Device
         if device is None:
@@ -70,41 +86,262 @@ class DQNAgent:
         else:
             self.device = torch.device(device)
 
+        # Per-agent RNG: exploration and replay sampling never touch global state.
+        # Network init gets its own child seed, so the two streams are independent.
+        init_seed = None
+        if seed is not None:
+            if not isinstance(seed, np.random.SeedSequence):
+                seed = np.random.SeedSequence(seed)
+            init_seed, seed = seed.spawn(2)
+        self.rng = np.random.default_rng(seed)
+
         print(f"Using device: {self.device}")
         print(f"Double DQN: {use_double_dqn}")
         print(f"Prioritized Replay: {use_per}")
         print(f"Buffer size: {buffer_size}")
-
-        # Networks - smaller architecture
-        self.policy_net = DQN(state_size, action_size).to(self.device)
-        self.target_net = DQN(state_size, action_size).to(self.device)
+        print(f"N-step returns: {n_step}")
+        print(f"Update schedule: {gradient_steps} step(s) every {train_every} env step(s), "
+              f"starting after {learning_starts}")
+
+        # Networks - smaller architecture. A seeded init runs on a forked torch
+        # RNG, so other agents and actors in the process are unaffected.
+        with torch.random.fork_rng(devices=[]) if init_seed is not None else contextlib.nullcontext():
+            if init_seed is not None:
+                torch.manual_seed(int(init_seed.generate_state(1, np.uint64)[0]))
+            self.policy_net = DQN(state_size, action_size).to(self.device)
+            self.target_net = DQN(state_size, action_size).to(self.device)
         self.target_net.load_state_dict(self.policy_net.state_dict())
         self.target_net.eval()
 
-        # Optimizer
-        self.optimizer = optim.Adam(self.policy_net.parameters(), lr=learning_rate)
+        # Optimizer (single fused kernel per step when available)
+        self.optimizer = None
+        if fused_forward:
+            try:
+                self.optimizer = optim.Adam(self.policy_net.parameters(), lr=learning_rate,
+                                            fused=True)
+            except (RuntimeError, TypeError):
+                pass
+        if self.optimizer is None:
+            self.optimizer = optim.Adam(self.policy_net.parameters(), lr=learning_rate)
+        self.loss_fn = nn.SmoothL1Loss()
 
         # Replay buffer - choose based on use_per
         if use_per:
-            self.memory = PrioritizedReplayBuffer(buffer_size, alpha=per_alpha)
+            self.memory = PrioritizedReplayBuffer(buffer_size, alpha=per_alpha,
+                                                  state_size=state_size, rng=self.rng,
+                                                  storage_dir=buffer_dir, compact=compact_buffer,
+                                                  n_step=n_step, gamma=gamma)
         else:
-            self.memory = ReplayBuffer(buffer_size)
+            self.memory = ReplayBuffer(buffer_size, state_size=state_size, rng=self.rng,
+                                       storage_dir=buffer_dir, compact=compact_buffer,
+                                       n_step=n_step, gamma=gamma)
+        print(f"Replay storage: {self.memory.memory_usage()['bytes_per_slot']:.0f} bytes/slot"
+              f"{' (compact)' if compact_buffer else ''}")
+        if self.memory.reopened:
+            print(f"Replay buffer reopened from {buffer_dir} ({len(self.memory)} transitions)")
 
         self.steps = 0
 
+        # Reusable batch tensors for train_step (see _ensure_staging)
+        self._staging = None
+        self._device_parts = None
+        self.tensor_allocations = 0
+
+        # Loss path used by train_step (compiled when requested)
+        self._policy_forward = self.policy_net
+        self._target_forward = self.target_net
+        self._loss_path = self._compute_loss
+        if compile_model:
+            backend = self._compile_loss_path()
+            print(f"Compiled loss path: {backend}")
+
+        # Update-to-data scheduling (see learn())
+        self.env_steps = 0
+        self.pending_updates = 0
+        self.memory_lock = threading.Lock()
+        self.params_lock = threading.Lock()     # optimizer step vs. checkpoint snapshot
+        self._snapshot_cache = None
+        self._schedule_cond = threading.Condition()
+        self._learner_thread = None
+        self._learner_stop = False
+        self._learner_losses = []
+        self._learner_error = None
+        self._max_learner_lag = 0
+
+        # Background batch sampler (see start_prefetch)
+        self._prefetcher = None
+
     def select_action(self, state: np.ndarray, training: bool = True) -> int:
         """Epsilon-greedy action selection"""
-        if training and random.random() < self.epsilon:
-            return random.randint(0, self.action_size - 1)
+        if training and self.rng.random() < self.epsilon:
+            return int(self.rng.integers(self.action_size))
 
         with torch.no_grad():
             state_tensor = torch.FloatTensor(state).unsqueeze(0).to(self.device)
             q_values = self.policy_net(state_tensor)
             return q_values.argmax(dim=1).item()
 
-    def store_transition(self, state, action, reward, next_state, done):
-        """Store transition in replay buffer"""
-        self.memory.push(state, action, reward, next_state, done)
+    def select_actions(self, states: np.ndarray, training: bool = True,
+                       epsilons: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Batched epsilon-greedy action selection for N environments
+
+        Args:
+            states: (N, state_size) array of states
+            training: Whether to explore
+            epsilons: Optional (N,) per-environment exploration rates
+                      (defaults to self.epsilon for every environment)
+
+        Returns:
+            (N,) int64 array of actions
+        """
+        states = np.asarray(states, dtype=np.float32)
+        n = len(states)
+
+        with torch.no_grad():
+            state_tensor = torch.from_numpy(states).to(self.device)
+            actions = self.policy_net(state_tensor).argmax(dim=1).cpu().numpy()
+
+        if training:
+            epsilon = self.epsilon if epsilons is None else np.asarray(epsilons)
+            explore = self.rng.random(n) < epsilon
+            random_actions = self.rng.integers(0, self.action_size, size=n)
+            actions = np.where(explore, random_actions, actions)
+
+        return actions
+
+    def store_transition(self, state, action, reward, next_state, done, n_steps=1):
+        """Store transition in replay buffer
+
+        n_steps > 1 marks an aggregated transition (reward already
+        discounted over n_steps frames; next_state bootstraps with
+        gamma ** n_steps).
+        """
+        with self.memory_lock:
+            self.memory.push(state, action, reward, next_state, done, n_steps)
+
+    def store_transitions(self, states, actions, rewards, next_states, dones, n_steps=1):
+        """Store a batch of transitions (e.g. one vectorized-env step)"""
+        with self.memory_lock:
+            self.memory.push_batch(states, actions, rewards, next_states, dones, n_steps)
+
+    def learn(self, num_env_steps: int = 1) -> List[float]:
+        """
+        Advance the update schedule by num_env_steps and run due train steps
+
+        Every `train_every` env steps (once `learning_starts` env steps have
+        been collected) `gradient_steps` train steps become due. Without a
+        background learner they run here; with one, they are handed to the
+        learner thread and this call only blocks while the learner lags
+        more than `max_lag` train steps behind the schedule.
+
+        Returns:
+            Losses of the train steps completed since the last call
+        """
+        previous = self.env_steps
+        self.env_steps += num_env_steps
+        due = 0
+        if self.env_steps >= self.learning_starts:
+            start = max(previous, self.learning_starts - 1)
+            due = (self.env_steps // self.train_every - start // self.train_every) \
+                * self.gradient_steps
+
+        if self._learner_thread is not None:
+            with self._schedule_cond:
+                self.pending_updates += due
+                self._schedule_cond.notify_all()
+                while self.pending_updates > self._max_learner_lag and self._learner_thread.is_alive():
+                    self._schedule_cond.wait()
+                self._raise_learner_error()
+                losses, self._learner_losses = self._learner_losses, []
+            return losses
+
+        losses = []
+        for _ in range(due):
+            loss = self.train_step()
+            if loss is not None:
+                losses.append(loss)
+        return losses
+
+    def start_background_learner(self, max_lag: int = 64):
+        """Run scheduled train steps on a separate thread
+
+        Torch releases the GIL inside its ops, so gradient steps overlap
+        with environment stepping on the calling thread.
+
+        Args:
+            max_lag: Pending train steps allowed before learn() waits for
+                     the learner, keeping the replay ratio on schedule
+
+        An exception in a train step stops the learner and is re-raised by
+        the next learn() or stop_background_learner().
+        """
+        if self._learner_thread is not None:
+            return
+        self._max_learner_lag = max_lag
+        self._learner_stop = False
+        self._learner_thread = threading.Thread(target=self._learner_loop, daemon=True)
+        self._learner_thread.start()
+
+    def stop_background_learner(self):
+        """Stop the learner thread (pending train steps are dropped)"""
+        if self._learner_thread is None:
+            return
+        with self._schedule_cond:
+            self._learner_stop = True
+            self._schedule_cond.notify_all()
+        self._learner_thread.join()
+        self._learner_thread = None
+        self.pending_updates = 0
+        with self._schedule_cond:
+            self._raise_learner_error()
+
+    def _raise_learner_error(self):
+        if self._learner_error is not None:
+            error, self._learner_error = self._learner_error, None
+            raise RuntimeError("Background learner failed") from error
+
+    def _learner_loop(self):
+        while True:
+            with self._schedule_cond:
+                while self.pending_updates == 0 and not self._learner_stop:
+                    self._schedule_cond.wait()
+                if self._learner_stop:
+                    return
+
+            try:
+                loss = self.train_step()
+            except Exception as error:
+                with self._schedule_cond:
+                    self._learner_error = error
+                    self._schedule_cond.notify_all()
+                return
+            with self._schedule_cond:
+                self.pending_updates -= 1
+                if loss is not None:
+                    self._learner_losses.append(loss)
+                self._schedule_cond.notify_all()
+
+    def start_prefetch(self, num_batches: int = 2):
+        """Prepare the next `num_batches` batches on a sampler thread
+
+        Sampling, staging and the device upload of upcoming batches then
+        overlap the current gradient step. Batches are drawn ahead of the
+        pushes that a synchronous train_step would see, so runs are not
+        bit-reproducible with prefetching on.
+        """
+        if self._prefetcher is not None:
+            return
+        beta = (lambda: self.per_beta) if self.use_per else None
+        self._prefetcher = BatchPrefetcher(self.memory, self.memory_lock, self.batch_size,
+                                           self._prefetch_slot, num_batches, beta)
+
+    def stop_prefetch(self):
+        """Stop the sampler thread (prepared batches are dropped)"""
+        if self._prefetcher is None:
+            return
+        self._prefetcher.close()
+        self._prefetcher = None
 
     def train_step(self) -> Optional[float]:
         """
@@ -119,68 +356,207 @@ class DQNAgent:
         if len(self.memory) < self.batch_size:
             return None
 
-        # Sample batch (different for PER vs standard)
-        if self.use_per:
-            result = self.memory.sample(self.batch_size, self.per_beta)
-            if result is None:
-                return None
-            states, actions, rewards, next_states, dones, indices, weights = result
-            weights = torch.FloatTensor(weights).to(self.device)
+        batch = None
+        if self._prefetcher is not None:
+            # Batch already sampled and uploaded by the sampler thread
+            batch = self._prefetcher.get()
+            _, device_parts, indices, drawn_at = batch
         else:
-            states, actions, rewards, next_states, dones = self.memory.sample(self.batch_size)
-            weights = None
+            # Sample batch straight into the staging arrays (different for PER vs standard)
+            staging_arrays = self._ensure_staging()
+            if self.use_per:
+                with self.memory_lock:
+                    drawn_at = self.memory.writes
+                    result = self.memory.sample(self.batch_size, self.per_beta,
+                                                out=staging_arrays)
+                if result is None:
+                    return None
+                indices = result[6]
+            else:
+                with self.memory_lock:
+                    self.memory.sample(self.batch_size, out=staging_arrays[:6])
+            device_parts = self._upload_batch()
+
+        try:
+            loss, td_errors = self._loss_path(*device_parts)
+
+            if self.use_per:
+                # Update priorities in replay buffer with the TD errors
+                priorities = td_errors.abs().cpu().numpy() + 1e-6
+                with self.memory_lock:
+                    # Slots rewritten since the batch was drawn (pushes from the acting
+                    # thread while a background learner or the prefetcher held it)
+                    # hold other transitions now
+                    fresh = ~self.memory.overwritten_since(drawn_at, indices)
+                    indices, priorities = indices[fresh], priorities[fresh]
+                    if len(indices):
+                        self.memory.update_priorities(indices, priorities)
+
+            with self.params_lock:
+                # Optimize
+                self.optimizer.zero_grad()
+                loss.backward()
+                torch.nn.utils.clip_grad_norm_(self.policy_net.parameters(), 1.0)
+                self.optimizer.step()
+
+                # Update target network
+                self.steps += 1
+                if self.soft_update:
+                    # Soft update: θ_target = τ*θ_policy + (1-τ)*θ_target
+                    self._soft_update_target()
+                elif self.steps % self.target_update_freq == 0:
+                    self.update_target_network()
+
+            loss = loss.item()
+        finally:
+            # Return the staging slot even if the update failed, or the
+            # sampler runs out of slots
+            if batch is not None:
+                self._prefetcher.release(batch)
+        return loss
+
+    def _compute_loss(self, obs, actions, rewards, dones, n_steps, weights):
+        """
+        TD loss for one staged batch
 
-        states = torch.FloatTensor(states).to(self.device)
-        actions = torch.LongTensor(actions).to(self.device)
-        rewards = torch.FloatTensor(rewards).to(self.device)
-        next_states = torch.FloatTensor(next_states).to(self.device)
-        dones = torch.FloatTensor(dones).to(self.device)
+        Args:
+            obs: (2 * batch_size, state_size) states stacked over next_states
+            actions, rewards, dones, n_steps, weights: (batch_size,) batch fields
 
-        # Current Q values
-        current_q = self.policy_net(states).gather(1, actions.unsqueeze(1))
+        Returns:
+            (loss, detached TD errors)
+        """
+        batch_size = obs.shape[0] // 2
+        states, next_states = obs[:batch_size], obs[batch_size:]
+
+        if self.fused_forward and self.use_double_dqn:
+            # One policy pass serves both Q(s, a) and the argmax over s'
+            q_all = self._policy_forward(obs)
+            current_q = q_all[:batch_size].gather(1, actions.unsqueeze(1)).squeeze(1)
+            next_actions = q_all[batch_size:].detach().argmax(1, keepdim=True)
+        else:
+            # Current Q values
+            current_q = self._policy_forward(states).gather(1, actions.unsqueeze(1)).squeeze(1)
 
         # Target Q values
         with torch.no_grad():
             if self.use_double_dqn:
                 # Double DQN: policy net selects action, target net evaluates
-                next_actions = self.policy_net(next_states).argmax(1, keepdim=True)
-                next_q = self.target_net(next_states).gather(1, next_actions).squeeze()
+                if not self.fused_forward:
+                    next_actions = self._policy_forward(next_states).argmax(1, keepdim=True)
+                next_q = self._target_forward(next_states).gather(1, next_actions).squeeze(1)
             else:
                 # Standard DQN
-                next_q = self.target_net(next_states).max(1)[0]
+                next_q = self._target_forward(next_states).max(1)[0]
 
-            target_q = rewards + (1 - dones) * self.gamma * next_q
+            target_q = rewards + (1 - dones) * self.gamma ** n_steps * next_q
 
-        # Compute TD errors for PER
-        td_errors = torch.abs(current_q.squeeze() - target_q).detach()
+        td = current_q - target_q
 
         # Compute loss (weighted for PER)
-        if self.use_per and weights is not None:
+        if self.use_per:
             # Weighted loss for importance sampling
-            element_wise_loss = (current_q.squeeze() - target_q) ** 2
-            loss = (weights * element_wise_loss).mean()
+            loss = (weights * td ** 2).mean()
+        else:
+            loss = self.loss_fn(current_q, target_q)
+
+        return loss, td.detach()
 
-            # Update priorities in replay buffer
-            priorities = td_errors.cpu().numpy() + 1e-6
-            self.memory.update_priorities(indices, priorities)
+    def _compile_loss_path(self) -> str:
+        """
+        Compile the train_step loss path, falling back gracefully
+
+        Tries torch.compile over the whole loss computation (forward
+        passes, targets and loss fused into one graph), then TorchScript
+        for the two networks, then stays eager.
+
+        Returns:
+            Name of the backend in use
+        """
+        self._ensure_staging()
+        try:
+            compiled = torch.compile(self._compute_loss)
+            compiled(*(torch.zeros_like(t) for t in self._device_parts))  # compile now
+            self._loss_path = compiled
+            return "torch.compile"
+        except Exception:
+            pass
+
+        policy_script = script_network(self.policy_net)
+        target_script = script_network(self.target_net)
+        if policy_script is not None and target_script is not None:
+            self._policy_forward = policy_script
+            self._target_forward = target_script
+            return "torchscript"
+
+        return "eager"
+
+    def _ensure_staging(self):
+        """
+        Return NumPy views of the reusable host batch tensors
+
+        Host tensors (pinned when training on CUDA) are allocated once per
+        batch size, and the replay buffer samples directly into their
+        NumPy views. On CPU they double as the training batch, so a train
+        step allocates no batch tensors at all; `tensor_allocations`
+        counts every (re)allocation. States and next_states are the two
+        halves of one (2 * batch_size, state_size) tensor, which the
+        fused forward pass consumes without a concatenation.
+        """
+        if self._staging is not None and self._staging[1].shape[0] == self.batch_size:
+            return self._staging_arrays
+
+        self._staging, self._staging_arrays, self._device_parts = self._allocate_staging()
+        return self._staging_arrays
+
+    def _allocate_staging(self):
+        """
+        Allocate one set of batch tensors (see _ensure_staging)
+
+        Returns:
+            (host tensors, NumPy views laid out for ReplayBuffer.sample,
+             device tensors - the host tensors themselves on CPU)
+        """
+        pin = self.device.type == 'cuda'
+        b, n = self.batch_size, self.state_size
+        staging = (
+            torch.empty((2 * b, n), dtype=torch.float32, pin_memory=pin),  # states | next_states
+            torch.empty(b, dtype=torch.int64, pin_memory=pin),             # actions
+            torch.empty(b, dtype=torch.float32, pin_memory=pin),           # rewards
+            torch.empty(b, dtype=torch.float32, pin_memory=pin),           # dones
+            torch.ones(b, dtype=torch.float32, pin_memory=pin),            # n_steps
+            torch.ones(b, dtype=torch.float32, pin_memory=pin),            # PER weights
+        )
+        self.tensor_allocations += len(staging)
+        obs, actions, rewards, dones, n_steps, weights = (t.numpy() for t in staging)
+        arrays = (obs[:b], actions, rewards, obs[b:], dones, n_steps, weights)
+
+        if self.device.type == 'cpu':
+            device_parts = staging
         else:
-            loss = nn.SmoothL1Loss()(current_q.squeeze(), target_q)
+            device_parts = tuple(torch.empty_like(t, device=self.device) for t in staging)
+            self.tensor_allocations += len(device_parts)
+
+        return staging, arrays, device_parts
 
-        # Optimize
-        self.optimizer.zero_grad()
-        loss.backward()
-        torch.nn.utils.clip_grad_norm_(self.policy_net.parameters(), 1.0)
-        self.optimizer.step()
+    def _prefetch_slot(self):
+        """Staging slot for BatchPrefetcher: (arrays, device tensors, upload)"""
+        staging, arrays, device_parts = self._allocate_staging()
 
-        # Update target network
-        self.steps += 1
-        if self.soft_update:
-            # Soft update: θ_target = τ*θ_policy + (1-τ)*θ_target
-            self._soft_update_target()
-        elif self.steps % self.target_update_freq == 0:
-            self.update_target_network()
+        def upload():
+            # Blocking copy on the sampler thread; the learner never waits on it
+            if device_parts is not staging:
+                for device_tensor, host_tensor in zip(device_parts, staging):
+                    device_tensor.copy_(host_tensor)
 
-        return loss.item()
+        return arrays, device_parts, upload
+
+    def _upload_batch(self):
+        """Copy the staged batch to the training device (no-op on CPU)"""
+        if self._device_parts is not self._staging:
+            for device_tensor, host_tensor in zip(self._device_parts, self._staging):
+                device_tensor.copy_(host_tensor, non_blocking=True)
+        return self._device_parts
 
     def _soft_update_target(self):
         """Soft update target network parameters"""
@@ -203,26 +579,105 @@ class DQNAgent:
         """Decay exploration rate"""
         self.epsilon = max(self.epsilon_end, self.epsilon * self.epsilon_decay)
 
-    def save(self, filepath: str):
-        """Save model to file"""
-        torch.save({
-            'policy_net': self.policy_net.state_dict(),
-            'target_net': self.target_net.state_dict(),
-            'optimizer': self.optimizer.state_dict(),
-            'epsilon': self.epsilon,
-            'steps': self.steps
-        }, filepath)
-        print(f"Model saved to {filepath}")
+    def snapshot(self) -> dict:
+        """
+        CPU copy of everything save() writes
+
+        Consecutive calls with no train step (and no epsilon change) in
+        between return the same object, so saving one state to several
+        paths is serialized only once by a CheckpointWriter.
+        """
+        key = (self.steps, self.epsilon)
+        if self._snapshot_cache is not None and self._snapshot_cache[0] == key:
+            return self._snapshot_cache[1]
+
+        with self.params_lock:
+            snapshot = {
+                'policy_net': _to_cpu(self.policy_net.state_dict()),
+                'target_net': _to_cpu(self.target_net.state_dict()),
+                'optimizer': _to_cpu(self.optimizer.state_dict()),
+                'epsilon': self.epsilon,
+                'steps': self.steps
+            }
+        self._snapshot_cache = (key, snapshot)
+        return snapshot
+
+    def save(self, filepath: str, writer: Optional[CheckpointWriter] = None,
+             rotate: bool = False):
+        """
+        Save model to file (atomically)
+
+        Args:
+            filepath: Destination path
+            writer: Hand the write to this background CheckpointWriter
+                    instead of blocking the caller
+            rotate: Count towards the writer's keep_last retention
+        """
+        snapshot = self.snapshot()
+        if writer is None:
+            atomic_write(filepath, serialize(snapshot))
+            print(f"Model saved to {filepath}")
+        else:
+            writer.submit(snapshot, filepath, rotate=rotate)
+            print(f"Model queued for {filepath}")
+
+    def training_state(self, deferred: bool = False) -> dict:
+        """
+        Everything besides snapshot() needed to resume training exactly:
+        schedule counters, PER beta, RNG states and replay contents
+
+        Args:
+            deferred: Return the replay contents as a Deferred for a
+                      CheckpointWriter, which copies them on its own thread
+                      (see ReplayBuffer.begin_snapshot) instead of here
+        """
+        with self.memory_lock:
+            if not deferred:
+                memory = self.memory.state_dict()
+            else:
+                snapshot = self.memory.begin_snapshot()
+                memory = Deferred(lambda: self._copy_memory_snapshot(snapshot),
+                                  lambda: self._end_memory_snapshot(snapshot))
+        return {
+            'per_beta': self.per_beta,
+            'env_steps': self.env_steps,
+            'rng': self.rng.bit_generator.state,
+            'memory': memory
+        }
+
+    def _copy_memory_snapshot(self, snapshot) -> dict:
+        state = None
+        try:
+            state = self.memory.snapshot_state(snapshot)
+        finally:
+            self._end_memory_snapshot(snapshot, state)
+        return state
+
+    def _end_memory_snapshot(self, snapshot, state: Optional[dict] = None):
+        with self.memory_lock:
+            self.memory.end_snapshot(snapshot, state)
+
+    def load_training_state(self, state: dict):
+        """Restore a training_state() (after load_snapshot())"""
+        self.per_beta = state['per_beta']
+        self.env_steps = state['env_steps']
+        self.rng.bit_generator.state = state['rng']
+        with self.memory_lock:
+            self.memory.load_state_dict(state['memory'])
 
     def load(self, filepath: str):
         """Load model from file"""
-        checkpoint = torch.load(filepath, map_location=self.device)
+        self.load_snapshot(torch.load(filepath, map_location=self.device))
+        print(f"Model loaded from {filepath}")
+
+    def load_snapshot(self, checkpoint: dict):
+        """Restore networks, optimizer, epsilon and steps from a snapshot()"""
         self.policy_net.load_state_dict(checkpoint['policy_net'])
         self.target_net.load_state_dict(checkpoint['target_net'])
         self.optimizer.load_state_dict(checkpoint['optimizer'])
         self.epsilon = checkpoint['epsilon']
         self.steps = checkpoint['steps']
-        print(f"Model loaded from {filepath}")
+        self._snapshot_cache = None
 
     def get_q_values(self, state: np.ndarray) -> np.ndarray:
         """Get Q-values for a state"""
@@ -230,3 +685,14 @@ class DQNAgent:
             state_tensor = torch.FloatTensor(state).unsqueeze(0).to(self.device)
             q_values = self.policy_net(state_tensor)
             return q_values.cpu().numpy()[0]
+
+
+def _to_cpu(obj):
+    """Detached CPU clone of every tensor in a (nested) state_dict"""
+    if torch.is_tensor(obj):
+        return obj.detach().to("cpu", copy=True)
+    if isinstance(obj, dict):
+        return {key: _to_cpu(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(_to_cpu(value) for value in obj)
+    return obj
@@ -0,0 +1,213 @@
+"""
+Asynchronous Checkpoint Writer
+Serializes agent snapshots on a background thread with atomic, fsync'd writes
+
+The training thread only copies state_dicts to CPU (see
+DQNAgent.snapshot()); pickling, writing and fsync happen here.  Saves
+queued for the same path before the writer reaches them are coalesced,
+and one snapshot saved to several paths (e.g. best and best_avg in the
+same episode) is serialized once.  Values too large to copy on the
+training thread can be queued as Deferred and are produced here instead.
+"""
+
+import io
+import os
+import threading
+from collections import deque
+from typing import Any, Callable, List, Optional
+
+
+def atomic_write(path: str, data: bytes):
+    """Write bytes to path via a temp file, fsync and atomic rename"""
+    directory = os.path.dirname(os.path.abspath(path))
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+    # Persist the rename itself (not supported on every platform)
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+
+
+def serialize(snapshot: dict) -> bytes:
+    import torch  # keeps atomic_write (used by the replay buffer) numpy-only
+
+    buffer = io.BytesIO()
+    torch.save(snapshot, buffer)
+    return buffer.getvalue()
+
+
+class Deferred:
+    """
+    Snapshot value produced on the writer thread
+
+    `produce` runs just before the snapshot is serialized; `cancel` runs
+    instead if the snapshot is replaced by a newer save of the same path
+    or its batch fails.  Whichever comes first wins, the other is a no-op.
+    """
+
+    def __init__(self, produce: Callable[[], Any], cancel: Optional[Callable[[], None]] = None):
+        self._produce = produce
+        self._cancel = cancel
+        self._done = False
+
+    def produce(self) -> Any:
+        self._done = True
+        return self._produce()
+
+    def cancel(self):
+        if not self._done:
+            self._done = True
+            if self._cancel is not None:
+                self._cancel()
+
+
+def _resolve(value):
+    """Copy of a snapshot with every Deferred replaced by its value"""
+    if isinstance(value, Deferred):
+        return value.produce()
+    if isinstance(value, dict):
+        return {key: _resolve(item) for key, item in value.items()}
+    return value
+
+
+def _cancel(value):
+    """Cancel every Deferred still unproduced in a snapshot"""
+    if isinstance(value, Deferred):
+        value.cancel()
+    elif isinstance(value, dict):
+        for item in value.values():
+            _cancel(item)
+
+
+class CheckpointWriter:
+    """
+    Background thread that writes checkpoint snapshots to disk
+
+    Rotating saves (e.g. periodic model_epN.pth files) keep only the
+    `keep_last` most recent files; other saves are never deleted.
+    Errors raised on the writer thread are re-raised by the next
+    submit(), flush() or close().
+    """
+
+    def __init__(self, keep_last: Optional[int] = None, rotated: Optional[List[str]] = None):
+        """
+        Args:
+            keep_last: Rotating checkpoints to keep (None = keep all)
+            rotated: Rotating checkpoints already on disk, oldest first
+                     (e.g. from before a resume); they count towards
+                     keep_last and are pruned like new ones
+        """
+        self.keep_last = keep_last
+        self.writes = 0
+        self.coalesced = 0
+
+        self._pending = {}              # path -> (snapshot, rotate)
+        self._rotated = deque(rotated or ())
+        self._busy = False
+        self._closed = False
+        self._error = None
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="checkpoint-writer",
+                                        daemon=True)
+        self._thread.start()
+
+    def submit(self, snapshot: dict, path: str, rotate: bool = False):
+        """Queue a snapshot to be written to path (returns immediately)"""
+        with self._cond:
+            self._raise_error()
+            if self._closed:
+                raise RuntimeError("CheckpointWriter is closed")
+            if path in self._pending:
+                self.coalesced += 1
+                replaced = self._pending[path][0]
+                if replaced is not snapshot and not any(
+                        other is replaced for other_path, (other, _) in self._pending.items()
+                        if other_path != path):
+                    _cancel(replaced)
+            self._pending[path] = (snapshot, rotate)
+            self._cond.notify_all()
+
+    def flush(self):
+        """Block until every queued snapshot is on disk"""
+        with self._cond:
+            while self._pending or self._busy:
+                self._cond.wait()
+            self._raise_error()
+
+    def close(self):
+        """Flush and stop the writer thread"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        with self._cond:
+            self._raise_error()
+
+    def _raise_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError("Checkpoint write failed") from error
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                batch, self._pending = self._pending, {}
+                self._busy = True
+
+            try:
+                self._write_batch(batch)
+            except Exception as error:
+                with self._cond:
+                    self._error = error
+
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+
+    def _write_batch(self, batch: dict):
+        # Group paths by snapshot so each snapshot is pickled once
+        groups = {}
+        for path, (snapshot, rotate) in batch.items():
+            groups.setdefault(id(snapshot), (snapshot, []))[1].append((path, rotate))
+
+        try:
+            for snapshot, targets in groups.values():
+                data = serialize(_resolve(snapshot))
+                for path, rotate in targets:
+                    atomic_write(path, data)
+                    self.writes += 1
+                    if rotate:
+                        self._retain(path)
+        finally:
+            for snapshot, _ in groups.values():
+                _cancel(snapshot)
+
+    def _retain(self, path: str):
+        """Record a rotating checkpoint and delete the oldest beyond keep_last"""
+        if path in self._rotated:
+            self._rotated.remove(path)
+        self._rotated.append(path)
+        if self.keep_last is None:
+            return
+        while len(self._rotated) > self.keep_last:
+            old_path = self._rotated.popleft()
+            try:
+                os.remove(old_path)
+            except FileNotFoundError:
+                pass
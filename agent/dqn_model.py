@@ -3,6 +3,9 @@ Deep Q-Network Model - Version 6.1 (Reverted to v5.0 simplicity)
 Clean implementation without unnecessary complications
 """
 
+import warnings
+from typing import Optional
+
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
@@ -82,3 +85,18 @@ class DuelingDQN(nn.Module):
         # Q = V + (A - mean(A))
         q_values = value + (advantage - advantage.mean(dim=1, keepdim=True))
         return q_values
+
+
+def script_network(net: nn.Module) -> Optional[torch.jit.ScriptModule]:
+    """
+    TorchScript a network, or return None if scripting is unavailable
+
+    The scripted module shares parameters with `net`, so optimizer
+    updates and load_state_dict on `net` are seen by it.
+    """
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", FutureWarning)
+            return torch.jit.script(net)
+    except Exception:
+        return None
@@ -0,0 +1,119 @@
+"""
+Prefetching Replay Sampler
+Prepares the next training batches on a background thread
+
+While the learner runs a gradient step, a sampler thread draws the next
+batches from the replay buffer into their own staging tensors (and
+uploads them to the training device).  Up to `num_batches` ready batches
+wait in a bounded queue; the learner hands each batch back with
+release() once its step is done, so its tensors can be refilled.
+"""
+
+import queue
+import threading
+from typing import Callable, Optional, Tuple
+
+
+class BatchPrefetcher:
+    """
+    Background sampler feeding DQNAgent.train_step
+
+    Each ready batch is (slot, tensors, indices, writes): the staging slot
+    to release, the device tensors for the loss, the PER indices (None for
+    uniform replay) and the buffer's write counter when it was drawn.
+    Priorities computed from a batch may arrive after newer transitions
+    have replaced some of its slots; pass `writes` to
+    ReplayBuffer.overwritten_since() to skip those updates.
+    """
+
+    def __init__(self, memory, memory_lock: threading.Lock, batch_size: int,
+                 allocate_slot: Callable[[], Tuple], num_batches: int = 2,
+                 beta: Optional[Callable[[], float]] = None):
+        """
+        Args:
+            memory: ReplayBuffer or PrioritizedReplayBuffer to sample from
+            memory_lock: Lock guarding the buffer against concurrent pushes
+            batch_size: Transitions per batch
+            allocate_slot: Returns one staging slot as (host arrays laid
+                           out like the agent's staging arrays, device tensors,
+                           upload function)
+            num_batches: Ready batches kept ahead of the learner (K)
+            beta: Returns the current PER beta; None for uniform replay
+        """
+        self.memory = memory
+        self.memory_lock = memory_lock
+        self.batch_size = batch_size
+        self.num_batches = num_batches
+        self.beta = beta
+        self.batches_drawn = 0
+
+        # K slots can wait in the queue while one more is in use by the learner
+        self._slots = [allocate_slot() for _ in range(num_batches + 1)]
+        self._free = queue.Queue()
+        for slot in range(len(self._slots)):
+            self._free.put(slot)
+        self._ready = queue.Queue(maxsize=num_batches)
+        self._stop = threading.Event()
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name="replay-prefetch", daemon=True)
+        self._thread.start()
+
+    def get(self, timeout: Optional[float] = None) -> Tuple:
+        """Next ready batch (blocks until the sampler has one)"""
+        while True:
+            if self._error is not None:
+                raise RuntimeError("Replay prefetch failed") from self._error
+            try:
+                return self._ready.get(timeout=0.1 if timeout is None else timeout)
+            except queue.Empty:
+                if timeout is not None or not self._thread.is_alive():
+                    raise
+
+    def release(self, batch: Tuple):
+        """Return a batch's staging slot to the sampler"""
+        self._free.put(batch[0])
+
+    def close(self):
+        """Stop the sampler thread; unconsumed batches are dropped"""
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        try:
+            while not self._stop.is_set():
+                try:
+                    slot = self._free.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                batch = self._draw(slot)
+                if batch is None:
+                    self._free.put(slot)
+                    self._stop.wait(0.001)
+                    continue
+                while not self._stop.is_set():
+                    try:
+                        self._ready.put(batch, timeout=0.1)
+                        break
+                    except queue.Full:
+                        pass
+        except Exception as error:
+            self._error = error
+
+    def _draw(self, slot: int) -> Optional[Tuple]:
+        """Sample into a staging slot; None while the buffer is too small"""
+        arrays, tensors, upload = self._slots[slot]
+        indices = None
+        with self.memory_lock:
+            if len(self.memory) < self.batch_size:
+                return None
+            writes = self.memory.writes
+            if self.beta is not None:
+                result = self.memory.sample(self.batch_size, self.beta(), out=arrays)
+                if result is None:
+                    return None
+                indices = result[6]
+            else:
+                self.memory.sample(self.batch_size, out=arrays[:6])
+        upload()
+        self.batches_drawn += 1
+        return slot, tensors, indices, writes
@@ -1,12 +1,24 @@
 """
 Experience Replay Buffer
 Stores and samples transitions for training
+
+Storage can optionally live in numpy.memmap'd .npy files in a directory,
+next to a small meta.json header (position, size, PER settings).  A
+restarted run or a separate analysis process reopens such a buffer
+without re-collecting or unpickling anything.
 """
 
-import random
+import os
+import json
 import numpy as np
-from collections import deque
-from typing import Tuple, List
+from typing import Tuple, List, Optional
+
+from .segment_tree import SumSegmentTree, MinSegmentTree
+from .checkpoint import atomic_write
+
+META_FILE = "meta.json"
+FIELDS = ("states", "actions", "rewards", "next_states", "dones", "n_steps")
+COMPACT_FIELDS = ("states", "actions", "rewards", "dones", "n_steps", "valid")
 
 
 class ReplayBuffer:
@@ -18,132 +30,797 @@ class ReplayBuffer:
 
     This helps break correlation between consecutive samples
     and improves training stability.
+
+    Storage is a ring buffer of preallocated contiguous arrays
+    (float32 states/rewards, int64 actions, bool dones), so push is
+    O(1) and sampling is a single fancy-indexing gather per field.
+
+    Every transition also records `n_steps`, the number of frames its
+    reward covers (1 for an ordinary step); the learner bootstraps
+    next_state with gamma ** n_steps.
+
+    With `storage_dir` the arrays are memory-mapped files instead; call
+    flush() to make the header match the data on disk (e.g. alongside
+    every checkpoint).  Transitions pushed after the last flush may be
+    lost or partially visible after a crash, but never corrupt the
+    transitions the header covers beyond replacing them with newer ones.
+
+    In-memory buffers can also be checkpointed without a stall:
+    begin_snapshot() only records the header, and the arrays are copied
+    later (e.g. on the checkpoint thread) while pushes keep going; each
+    slot overwritten in the meantime is saved first and put back into
+    the copy by end_snapshot().
+
+    With `compact=True` every observation is stored once: slot i holds
+    the state of transition i and next_state is read from slot i + 1.
+    Consecutive pushes continue an episode when the new state equals the
+    previous next_state; otherwise (episode end, truncation, another
+    actor's stream) the previous next_state keeps its slot as a
+    non-sampleable holder.  This costs one slot per episode boundary, so
+    `capacity` and len() count slots rather than transitions.
+
+    With `n_step > 1`, sampling turns each stored transition into an
+    n-step one, vectorized over the batch: the rewards of up to n
+    consecutive transitions of the same episode are discounted by gamma
+    per frame and summed, and next_state, done and n_steps come from the
+    last transition used.  The window stops early at a terminal, at a
+    break in the stored sequence (next_state != following state) and at
+    the write position.  Storage stays one-step, so n can change between
+    runs without re-collecting.
     """
 
-    def __init__(self, capacity: int = 100000):
+    def __init__(self, capacity: int = 100000, state_size: Optional[int] = None,
+                 rng: Optional[np.random.Generator] = None,
+                 storage_dir: Optional[str] = None, mode: str = "r+",
+                 compact: bool = False, n_step: int = 1, gamma: float = 0.99):
         """
         Initialize replay buffer
 
         Args:
             capacity: Maximum number of transitions to store
+            state_size: State dimension. If None, storage is allocated
+                        on the first push from the state's shape.
+            rng: Random generator for sampling (a fresh unseeded one if None)
+            storage_dir: Directory for memory-mapped storage. An existing
+                         buffer there (same capacity) is reopened as is.
+            mode: memmap mode when reopening ("r+" or read-only "r")
+            compact: Store each observation once (see class docstring)
+            n_step: Transitions per sampled return (see class docstring)
+            gamma: Per-frame discount for n-step returns
+        """
+        if compact and capacity < 2:
+            raise ValueError("A compact buffer needs a capacity of at least 2")
+        if not 1 <= n_step <= capacity:
+            raise ValueError(f"n_step must be between 1 and capacity, got {n_step}")
+        self.capacity = capacity
+        self.compact = compact
+        self.n_step = n_step
+        self.gamma = gamma
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.position = 0
+        self.writes = 0         # slots the write position has advanced (overwritten_since)
+        self.size = 0
+        self.storage_dir = storage_dir
+        self.mode = mode
+        self._meta = None
+        self._memmaps = []
+        self._snapshots = []    # open BufferSnapshots (begin_snapshot)
+
+        self.states = None
+        self.actions = None
+        self.rewards = None
+        self.next_states = None
+        self.dones = None
+        self.n_steps = None
+        self.valid = None
+        self._tail = False      # compact: slot `position` holds the last next_state
+        if storage_dir is not None and os.path.exists(os.path.join(storage_dir, META_FILE)):
+            self._open_storage()
+        elif state_size is not None:
+            self._allocate((state_size,))
+
+    @property
+    def reopened(self) -> bool:
+        """Whether storage was reopened from an existing storage_dir"""
+        return self._meta is not None
+
+    def _storage_array(self, name: str, shape: Tuple[int, ...], dtype, fill=0) -> np.ndarray:
+        """In-memory array, or a memmap'd .npy file in storage_dir"""
+        if self.storage_dir is None:
+            return np.full(shape, fill, dtype=dtype)
+
+        path = os.path.join(self.storage_dir, f"{name}.npy")
+        if self.reopened and os.path.exists(path):
+            array = np.lib.format.open_memmap(path, mode=self.mode)
+            if array.shape != tuple(shape) or array.dtype != np.dtype(dtype):
+                raise ValueError(f"{path} has shape {array.shape} / {array.dtype}, "
+                                 f"expected {tuple(shape)} / {np.dtype(dtype)}")
+        else:
+            os.makedirs(self.storage_dir, exist_ok=True)
+            array = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=tuple(shape))
+            if fill != 0:
+                array[:] = fill
+        self._memmaps.append(array)
+        return array
+
+    def _allocate(self, state_shape: Tuple[int, ...]):
+        """Preallocate storage arrays for `capacity` transitions"""
+        self.state_shape = tuple(state_shape)
+        self.states = self._storage_array("states", (self.capacity, *state_shape), np.float32)
+        self.actions = self._storage_array("actions", (self.capacity,), np.int64)
+        self.rewards = self._storage_array("rewards", (self.capacity,), np.float32)
+        if not self.compact:
+            self.next_states = self._storage_array("next_states",
+                                                   (self.capacity, *state_shape), np.float32)
+        self.dones = self._storage_array("dones", (self.capacity,), bool)
+        self.n_steps = self._storage_array("n_steps", (self.capacity,), np.int32, 1)
+        if self.compact:
+            self.valid = self._storage_array("valid", (self.capacity,), bool)
+
+    @property
+    def fields(self) -> Tuple[str, ...]:
+        """Names of the storage arrays"""
+        return COMPACT_FIELDS if self.compact else FIELDS
+
+    def memory_usage(self) -> dict:
+        """
+        Bytes held by the storage arrays (including PER trees)
+
+        Returns:
+            Dictionary with total bytes, bytes per slot, the number of
+            sampleable transitions and bytes per stored transition
+        """
+        arrays = [getattr(self, name) for name in self.fields]
+        arrays += self._extra_arrays()
+        total = sum(a.nbytes for a in arrays if a is not None)
+        transitions = self.num_transitions()
+        return {
+            "bytes": total,
+            "bytes_per_slot": total / self.capacity,
+            "transitions": transitions,
+            "bytes_per_transition": total / transitions if transitions else float("nan"),
+        }
+
+    def _extra_arrays(self) -> List[np.ndarray]:
+        """Storage besides the per-transition fields (memory_usage)"""
+        return []
+
+    def num_transitions(self) -> int:
+        """Number of sampleable transitions (len() minus compact holder slots)"""
+        if not self.compact or self.valid is None:
+            return self.size
+        return int(np.count_nonzero(self.valid[:self.size]))
+
+    def _open_storage(self):
+        """Reopen memory-mapped storage and restore position/size from the header"""
+        with open(os.path.join(self.storage_dir, META_FILE)) as f:
+            self._meta = json.load(f)
+        if self._meta["capacity"] != self.capacity:
+            raise ValueError(f"Replay storage in {self.storage_dir} has capacity "
+                             f"{self._meta['capacity']}, expected {self.capacity}")
+        if self._meta.get("compact", False) != self.compact:
+            raise ValueError(f"Replay storage in {self.storage_dir} has compact="
+                             f"{self._meta.get('compact', False)}, expected {self.compact}")
+        self.position = self._meta["position"]
+        self.writes = self.position
+        self.size = self._meta["size"]
+        self._tail = self._meta.get("tail", False)
+        if self._meta["state_shape"] is not None:
+            self._allocate(tuple(self._meta["state_shape"]))
+
+    def _metadata(self) -> dict:
+        return {
+            "version": 1,
+            "capacity": self.capacity,
+            "position": self.position,
+            "size": self.size,
+            "state_shape": None if self.states is None else list(self.state_shape),
+            "prioritized": False,
+            "compact": self.compact,
+            "tail": self._tail,
+        }
+
+    def flush(self):
+        """Write memory-mapped data to disk, then the header describing it"""
+        if self.storage_dir is None or self.mode == "r":
+            return
+        for array in self._memmaps:
+            array.flush()
+        os.makedirs(self.storage_dir, exist_ok=True)
+        atomic_write(os.path.join(self.storage_dir, META_FILE),
+                     json.dumps(self._metadata(), indent=2).encode())
+
+    def _snapshot_arrays(self) -> dict:
+        """Per-slot arrays saved by state_dict(), by name"""
+        return {name: getattr(self, name) for name in self.fields}
+
+    def state_dict(self) -> dict:
+        """
+        Buffer contents for a training checkpoint
+
+        Memory-mapped buffers are flushed and contribute only their
+        header; in-memory buffers copy the filled part of every array.
+        """
+        state = self._metadata()
+        if self.storage_dir is not None:
+            self.flush()
+            return state
+        if self.states is not None:
+            for name, array in self._snapshot_arrays().items():
+                state[name] = array[:self.size].copy()
+        return state
+
+    def begin_snapshot(self) -> "BufferSnapshot":
+        """
+        Start a state_dict() as of now without copying the arrays
+
+        Call under the lock that guards pushes, then pass the snapshot to
+        snapshot_state() (no lock needed) and finally end_snapshot()
+        (under the lock again).  Memory-mapped buffers are flushed here,
+        as in state_dict().
         """
-        self.buffer = deque(maxlen=capacity)
+        if self.storage_dir is not None:
+            self.flush()
+            return BufferSnapshot(self._metadata(), copy=False)
+        snapshot = BufferSnapshot(self._metadata(), copy=self.states is not None)
+        if snapshot.saved is not None:
+            self._snapshots.append(snapshot)
+        return snapshot
+
+    def snapshot_state(self, snapshot: "BufferSnapshot") -> dict:
+        """
+        Copy the arrays of an open snapshot
+
+        Runs concurrently with pushes, so slots written meanwhile may be
+        torn or newer; end_snapshot() replaces them with the saved rows.
+        """
+        state = dict(snapshot.header)
+        if snapshot.saved is not None:
+            for name, array in self._snapshot_arrays().items():
+                state[name] = array[:snapshot.size].copy()
+        return state
+
+    def end_snapshot(self, snapshot: "BufferSnapshot", state: Optional[dict] = None):
+        """
+        Close a snapshot (under the push lock), fixing up its state
+
+        Args:
+            snapshot: Snapshot from begin_snapshot()
+            state: Its snapshot_state(), or None to discard the snapshot
+        """
+        if snapshot in self._snapshots:
+            self._snapshots.remove(snapshot)
+        if state is None or not snapshot.saved:
+            return
+        names = list(self._snapshot_arrays())
+        for idx, row in snapshot.saved.items():
+            for name, value in zip(names, row):
+                state[name][idx] = value
+
+    def _preserve(self, indices):
+        """Save slots about to be overwritten for every open snapshot"""
+        arrays = list(self._snapshot_arrays().values())
+        for snapshot in self._snapshots:
+            snapshot.save(arrays, indices)
+
+    def load_state_dict(self, state: dict):
+        """Restore a state_dict() taken from a buffer of the same capacity"""
+        if state["capacity"] != self.capacity:
+            raise ValueError(f"Buffer state has capacity {state['capacity']}, "
+                             f"expected {self.capacity}")
+        if state.get("compact", False) != self.compact:
+            raise ValueError(f"Buffer state has compact={state.get('compact', False)}, "
+                             f"expected {self.compact}")
+        self.position = state["position"]
+        self.writes = self.position
+        self.size = state["size"]
+        self._tail = state.get("tail", False)
+        if self.storage_dir is None and "states" in state:
+            if self.states is None:
+                self._allocate(tuple(state["state_shape"]))
+            for name in self.fields:
+                if name in state:
+                    getattr(self, name)[:self.size] = state[name]
 
     def push(self, state: np.ndarray, action: int, reward: float,
-             next_state: np.ndarray, done: bool):
+             next_state: np.ndarray, done: bool, n_steps: int = 1):
         """
         Add a transition to the buffer
 
         Args:
             state: Current state
             action: Action taken
-            reward: Reward received
+            reward: Reward received (discounted sum if n_steps > 1)
             next_state: Resulting state
             done: Whether episode ended
+            n_steps: Frames between state and next_state
+        """
+        if self.states is None:
+            self._allocate(np.shape(state))
+        if self.compact:
+            return self._push_compact(state, action, reward, next_state, done, n_steps)
+
+        idx = self.position
+        if self._snapshots:
+            self._preserve(idx)
+        self.states[idx] = state
+        self.actions[idx] = action
+        self.rewards[idx] = reward
+        self.next_states[idx] = next_state
+        self.dones[idx] = done
+        self.n_steps[idx] = n_steps
+
+        self.position = (idx + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        self.writes += 1
+        return idx
+
+    def _push_compact(self, state, action, reward, next_state, done, n_steps) -> int:
+        idx = self.position
+        new_slots = 1
+        if not (self._tail and np.array_equal(self.states[idx], state)):
+            if self._tail:
+                # Episode boundary: the previous next_state stays as a holder
+                idx = (idx + 1) % self.capacity
+            new_slots = 2
+        if self._snapshots:
+            self._preserve([idx, (idx + 1) % self.capacity])
+
+        self.states[idx] = state
+        self.actions[idx] = action
+        self.rewards[idx] = reward
+        self.dones[idx] = done
+        self.n_steps[idx] = n_steps
+        self.valid[idx] = True
+
+        next_idx = (idx + 1) % self.capacity
+        self.states[next_idx] = next_state
+        self.valid[next_idx] = False
+        self._invalidate(next_idx)
+
+        self._tail = True
+        self.writes += (next_idx - self.position) % self.capacity
+        self.position = next_idx
+        self.size = min(self.size + new_slots, self.capacity)
+        return idx
+
+    def _invalidate(self, indices):
+        """Hook for slots that stop holding a sampleable transition"""
+
+    def push_batch(self, states: np.ndarray, actions: np.ndarray, rewards: np.ndarray,
+                   next_states: np.ndarray, dones: np.ndarray, n_steps=1):
         """
-        self.buffer.append((state, action, reward, next_state, done))
+        Add a batch of transitions (e.g. one step of a vectorized env)
 
-    def sample(self, batch_size: int) -> Tuple[np.ndarray, ...]:
+        Args:
+            states: (N, state_size) current states
+            actions: (N,) actions taken
+            rewards: (N,) rewards received
+            next_states: (N, state_size) resulting states
+            dones: (N,) episode-end flags
+            n_steps: (N,) frames per transition, or one value for all
+
+        Returns:
+            Array of the buffer indices that were written
+        """
+        states = np.asarray(states)
+        n = len(states)
+        if self.states is None:
+            self._allocate(states.shape[1:])
+        if self.compact:
+            return self._push_batch_compact(states, actions, rewards, next_states, dones,
+                                            n_steps)
+
+        # Only the newest `capacity` transitions can survive the write
+        skip = max(0, n - self.capacity)
+        idx = (self.position + skip + np.arange(n - skip)) % self.capacity
+        if self._snapshots:
+            self._preserve(idx)
+
+        self.states[idx] = states[skip:]
+        self.actions[idx] = np.asarray(actions)[skip:]
+        self.rewards[idx] = np.asarray(rewards)[skip:]
+        self.next_states[idx] = np.asarray(next_states)[skip:]
+        self.dones[idx] = np.asarray(dones)[skip:]
+        self.n_steps[idx] = np.broadcast_to(n_steps, (n,))[skip:]
+
+        self.position = (self.position + n) % self.capacity
+        self.size = min(self.size + n, self.capacity)
+        self.writes += n
+        return idx
+
+    def _push_batch_compact(self, states, actions, rewards, next_states, dones, n_steps):
+        n = len(states)
+        next_states = np.asarray(next_states)
+        n_steps = np.broadcast_to(n_steps, (n,))
+
+        # A transition continues the previous one when its state equals that
+        # next_state; every break leaves one holder slot behind
+        continues = np.empty(n, dtype=bool)
+        continues[0] = self._tail and np.array_equal(self.states[self.position], states[0])
+        continues[1:] = np.all(states[1:] == next_states[:-1],
+                               axis=tuple(range(1, states.ndim)))
+        breaks = ~continues
+        if not self._tail:
+            breaks[0] = False
+        offsets = np.arange(n) + np.cumsum(breaks)
+        span = int(offsets[-1]) + 2
+
+        if span > self.capacity:
+            # The batch would wrap onto itself: write one transition at a time
+            idx = np.array([self._push_compact(states[i], actions[i], rewards[i],
+                                               next_states[i], dones[i], n_steps[i])
+                            for i in range(n)])
+            return idx[self.valid[idx]]
+
+        idx = (self.position + offsets) % self.capacity
+        holders = (idx[np.append(breaks[1:], True)] + 1) % self.capacity
+        if self._snapshots:
+            self._preserve(np.concatenate([idx, (idx + 1) % self.capacity]))
+
+        self.states[(idx + 1) % self.capacity] = next_states
+        self.states[idx] = states
+        self.actions[idx] = np.asarray(actions)
+        self.rewards[idx] = np.asarray(rewards)
+        self.dones[idx] = np.asarray(dones)
+        self.n_steps[idx] = n_steps
+        self.valid[holders] = False
+        self.valid[idx] = True
+        self._invalidate(holders)
+
+        # With a tail, slot `position` was already counted (a continued
+        # transition reuses it, a break leaves it as a holder)
+        new_slots = span - 1 if self._tail else span
+        self._tail = True
+        self.writes += (int(holders[-1]) - self.position) % self.capacity
+        self.position = int(holders[-1])
+        self.size = min(self.size + new_slots, self.capacity)
+        return idx
+
+    def overwritten_since(self, writes: int, indices) -> np.ndarray:
+        """
+        Which slots were rewritten after `self.writes` was `writes`
+
+        Lets a consumer holding sampled indices for a while (e.g. a
+        prefetched batch) skip priority updates for slots that now hold
+        newer transitions.
+
+        Returns:
+            Boolean mask over `indices`
+        """
+        indices = np.asarray(indices)
+        advanced = self.writes - writes
+        # Compact pushes also rewrite the slot at the new write position
+        written = advanced + 1 if self.compact and advanced > 0 else advanced
+        if written >= self.capacity:
+            return np.ones(indices.shape, dtype=bool)
+        return (indices - writes) % self.capacity < written
+
+    def _next_indices(self, indices: np.ndarray) -> np.ndarray:
+        """compact: slot holding the next_state of each transition"""
+        next_indices = indices + 1
+        next_indices[next_indices == self.capacity] = 0
+        return next_indices
+
+    def _gather(self, indices: np.ndarray, out: Optional[Tuple[np.ndarray, ...]] = None
+                ) -> Tuple[np.ndarray, ...]:
+        """Fetch the transitions at `indices` as batch arrays
+
+        If `out` is given (states, actions, rewards, next_states, dones,
+        n_steps arrays of the batch shape), the batch is written into it
+        in place.
+        """
+        if self.n_step > 1:
+            return self._gather_n_step(indices, out)
+        if out is None:
+            return (
+                self.states[indices],
+                self.actions[indices],
+                self.rewards[indices],
+                self.states[self._next_indices(indices)] if self.compact
+                else self.next_states[indices],
+                self.dones[indices].astype(np.float32),
+                self.n_steps[indices],
+            )
+
+        states, actions, rewards, next_states, dones, n_steps = out
+        np.take(self.states, indices, axis=0, out=states, mode='clip')
+        np.take(self.actions, indices, out=actions, mode='clip')
+        np.take(self.rewards, indices, out=rewards, mode='clip')
+        if self.compact:
+            np.take(self.states, self._next_indices(indices), axis=0, out=next_states,
+                    mode='clip')
+        else:
+            np.take(self.next_states, indices, axis=0, out=next_states, mode='clip')
+        np.copyto(dones, self.dones[indices])
+        np.copyto(n_steps, self.n_steps[indices])
+        return out
+
+    def _n_step_window(self, indices: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Slots of the n transitions starting at each index
+
+        Returns:
+            (slots, used) - (batch, n_step) slot indices and whether each
+            one belongs to the n-step return (a prefix of every row)
+        """
+        slots = (indices[:, None] + np.arange(self.n_step)) % self.capacity
+        follows = ~self.dones[slots[:, :-1]] & (slots[:, 1:] != self.position)
+        if self.compact:
+            # A valid slot right after another one holds its next_state
+            follows &= self.valid[slots[:, 1:]]
+        else:
+            follows &= np.all(self.states[slots[:, 1:]] == self.next_states[slots[:, :-1]],
+                              axis=tuple(range(2, self.states.ndim + 1)))
+        used = np.ones(slots.shape, dtype=bool)
+        used[:, 1:] = np.logical_and.accumulate(follows, axis=1)
+        return slots, used
+
+    def _gather_n_step(self, indices: np.ndarray, out: Optional[Tuple[np.ndarray, ...]] = None
+                       ) -> Tuple[np.ndarray, ...]:
+        """_gather with n-step rewards, next_states, dones and n_steps"""
+        slots, used = self._n_step_window(indices)
+        frames = np.where(used, self.n_steps[slots], 0)
+        exponents = np.cumsum(frames, axis=1) - frames
+        rewards = np.where(used, self.rewards[slots] * self.gamma ** exponents, 0.0).sum(axis=1)
+        last = slots[np.arange(len(indices)), used.sum(axis=1) - 1]
+
+        batch = (
+            self.states[indices],
+            self.actions[indices],
+            rewards.astype(np.float32),
+            self.states[self._next_indices(last)] if self.compact else self.next_states[last],
+            self.dones[last].astype(np.float32),
+            frames.sum(axis=1).astype(np.int32),
+        )
+        if out is None:
+            return batch
+        for array, values in zip(out, batch):
+            np.copyto(array, values)
+        return out
+
+    def sample(self, batch_size: int, out: Optional[Tuple[np.ndarray, ...]] = None
+               ) -> Tuple[np.ndarray, ...]:
         """
         Sample a random batch of transitions
 
         Args:
             batch_size: Number of transitions to sample
+            out: Optional preallocated (states, actions, rewards,
+                 next_states, dones, n_steps) arrays to fill in place
 
         Returns:
-            Tuple of (states, actions, rewards, next_states, dones)
+            Tuple of (states, actions, rewards, next_states, dones, n_steps)
         """
-        batch = random.sample(self.buffer, batch_size)
-
-        states = np.array([t[0] for t in batch], dtype=np.float32)
-        actions = np.array([t[1] for t in batch], dtype=np.int64)
-        rewards = np.array([t[2] for t in batch], dtype=np.float32)
-        next_states = np.array([t[3] for t in batch], dtype=np.float32)
-        dones = np.array([t[4] for t in batch], dtype=np.float32)
-
-        return states, actions, rewards, next_states, dones
+        indices = self.rng.integers(0, self.size, size=batch_size)
+        if self.compact:
+            # Redraw holder slots (about one per episode)
+            invalid = ~self.valid[indices]
+            while invalid.any():
+                indices[invalid] = self.rng.integers(0, self.size, size=int(invalid.sum()))
+                invalid = ~self.valid[indices]
+        return self._gather(indices, out)
 
     def __len__(self) -> int:
         """Return current size of buffer"""
-        return len(self.buffer)
+        return self.size
 
     def is_ready(self, batch_size: int) -> bool:
         """Check if buffer has enough samples for a batch"""
-        return len(self.buffer) >= batch_size
+        return self.size >= batch_size
 
 
-class PrioritizedReplayBuffer:
+class PrioritizedReplayBuffer(ReplayBuffer):
     """
     Prioritized Experience Replay Buffer (optional advanced version)
 
     Samples transitions based on their TD error priority,
     so important transitions are replayed more often.
+
+    Priorities (raised to alpha) live in a sum tree for O(log n)
+    stratified sampling and a min tree for the importance-sampling
+    weight normalizer, so sampling cost does not grow with the
+    number of stored transitions.
     """
 
-    def __init__(self, capacity: int = 100000, alpha: float = 0.6):
+    def __init__(self, capacity: int = 100000, alpha: float = 0.6,
+                 state_size: Optional[int] = None,
+                 rng: Optional[np.random.Generator] = None,
+                 storage_dir: Optional[str] = None, mode: str = "r+",
+                 compact: bool = False, n_step: int = 1, gamma: float = 0.99):
         """
         Initialize prioritized replay buffer
 
         Args:
             capacity: Maximum buffer size
             alpha: Priority exponent (0 = uniform, 1 = full prioritization)
+            state_size: State dimension (see ReplayBuffer)
+            rng: Random generator for sampling (see ReplayBuffer)
+            storage_dir: Memory-mapped storage, including both priority
+                         trees (see ReplayBuffer)
+            mode: memmap mode when reopening (see ReplayBuffer)
+            compact: Store each observation once (see ReplayBuffer)
+            n_step: Transitions per sampled return (see ReplayBuffer)
+            gamma: Per-frame discount for n-step returns
         """
-        self.capacity = capacity
+        super(PrioritizedReplayBuffer, self).__init__(capacity, state_size, rng,
+                                                      storage_dir, mode, compact, n_step, gamma)
         self.alpha = alpha
-        self.buffer = []
-        self.priorities = np.zeros(capacity, dtype=np.float32)
-        self.position = 0
         self.max_priority = 1.0
+        self.sum_tree = SumSegmentTree(capacity)
+        self.min_tree = MinSegmentTree(capacity)
+
+        if self.reopened:
+            if not self._meta.get("prioritized"):
+                raise ValueError(f"Replay storage in {storage_dir} has no priorities")
+            if self._meta["alpha"] != alpha:
+                raise ValueError(f"Replay storage in {storage_dir} uses alpha="
+                                 f"{self._meta['alpha']}, expected {alpha}")
+            self.max_priority = self._meta["max_priority"]
+        self.sum_tree.tree = self._storage_array("sum_tree", self.sum_tree.tree.shape,
+                                                 np.float64, 0.0)
+        self.min_tree.tree = self._storage_array("min_tree", self.min_tree.tree.shape,
+                                                 np.float64, float('inf'))
+        if self.reopened:
+            if mode == "r":
+                self.sum_tree.tree = np.array(self.sum_tree.tree)
+                self.min_tree.tree = np.array(self.min_tree.tree)
+            self._clear_priorities_from(self.size)
+
+    def _clear_priorities_from(self, start: int):
+        """
+        Zero the priorities of slots >= start and rebuild both trees
 
-    def push(self, state, action, reward, next_state, done):
+        Memory-mapped trees can hold priorities of slots pushed after the
+        last flush, beyond the size the header restores; sampling must
+        never land there.
+        """
+        self.sum_tree.tree[self.sum_tree.capacity + start:] = 0.0
+        self.min_tree.tree[self.min_tree.capacity + start:] = float('inf')
+        self.sum_tree.rebuild()
+        self.min_tree.rebuild()
+
+    def _metadata(self) -> dict:
+        meta = super(PrioritizedReplayBuffer, self)._metadata()
+        meta.update(prioritized=True, alpha=self.alpha, max_priority=self.max_priority)
+        return meta
+
+    def _snapshot_arrays(self) -> dict:
+        """Fields plus the tree leaves; inner nodes are rebuilt on load"""
+        arrays = super(PrioritizedReplayBuffer, self)._snapshot_arrays()
+        arrays["priorities"] = self.sum_tree.tree[self.sum_tree.capacity:]
+        arrays["min_priorities"] = self.min_tree.tree[self.min_tree.capacity:]
+        return arrays
+
+    def load_state_dict(self, state: dict):
+        super(PrioritizedReplayBuffer, self).load_state_dict(state)
+        self.max_priority = state["max_priority"]
+        if self.storage_dir is not None:
+            self._clear_priorities_from(self.size)
+            return
+        if "priorities" in state:
+            indices = np.arange(self.size)
+            self.sum_tree.tree[:] = 0.0
+            self.min_tree.tree[:] = float('inf')
+            self.sum_tree[indices] = state["priorities"]
+            self.min_tree[indices] = state["min_priorities"]
+
+    def _extra_arrays(self) -> List[np.ndarray]:
+        return [self.sum_tree.tree, self.min_tree.tree]
+
+    def _invalidate(self, indices):
+        """Holder slots get zero priority, so they are never sampled"""
+        self.sum_tree[indices] = 0.0
+        self.min_tree[indices] = float('inf')
+
+    def push(self, state, action, reward, next_state, done, n_steps=1):
         """Add transition with max priority"""
-        transition = (state, action, reward, next_state, done)
+        idx = super(PrioritizedReplayBuffer, self).push(state, action, reward, next_state, done,
+                                                        n_steps)
+        priority = self.max_priority ** self.alpha
+        self.sum_tree[idx] = priority
+        self.min_tree[idx] = priority
+        return idx
+
+    def push_batch(self, states, actions, rewards, next_states, dones, n_steps=1):
+        """Add a batch of transitions, all with max priority"""
+        idx = super(PrioritizedReplayBuffer, self).push_batch(
+            states, actions, rewards, next_states, dones, n_steps)
+        priority = self.max_priority ** self.alpha
+        self.sum_tree[idx] = priority
+        self.min_tree[idx] = priority
+        return idx
+
+    def sample(self, batch_size: int, beta: float = 0.4,
+               out: Optional[Tuple[np.ndarray, ...]] = None) -> Tuple:
+        """Sample batch based on priorities
+
+        `out` works as in ReplayBuffer.sample, with an extra trailing
+        weights array.
 
-        if len(self.buffer) < self.capacity:
-            self.buffer.append(transition)
-        else:
-            self.buffer[self.position] = transition
-
-        self.priorities[self.position] = self.max_priority
-        self.position = (self.position + 1) % self.capacity
-
-    def sample(self, batch_size: int, beta: float = 0.4) -> Tuple:
-        """Sample batch based on priorities"""
-        if len(self.buffer) == 0:
+        Returns:
+            (states, actions, rewards, next_states, dones, n_steps,
+             indices, weights)
+        """
+        if self.size == 0:
             return None
 
-        # Calculate sampling probabilities
-        priorities = self.priorities[:len(self.buffer)]
-        probs = priorities ** self.alpha
-        probs /= probs.sum()
+        # Stratified sampling: one uniform draw per equal-mass segment
+        total = self.sum_tree.sum()
+        segment = total / batch_size
+        mass = (np.arange(batch_size) + self.rng.random(batch_size)) * segment
+        indices = self.sum_tree.find_prefixsum_idx(mass)
+        # Rounding at a segment edge can land on a zero-priority leaf (a
+        # compact holder, or an empty slot past the last transition)
+        invalid = self.sum_tree[indices] == 0.0
+        while invalid.any():
+            mass[invalid] = self.rng.random(int(invalid.sum())) * total
+            indices[invalid] = self.sum_tree.find_prefixsum_idx(mass[invalid])
+            invalid = self.sum_tree[indices] == 0.0
+        if indices.max() >= self.size:
+            raise RuntimeError(f"Sampled slot {indices.max()} beyond buffer size {self.size}; "
+                               "the priority tree does not match the stored transitions")
+
+        # Importance sampling weights, normalized by the largest possible weight
+        probs = self.sum_tree[indices] / total
+        p_min = self.min_tree.min() / total
+        max_weight = (self.size * p_min) ** (-beta)
+        weights = (self.size * probs) ** (-beta) / max_weight
+
+        if out is None:
+            weights = np.array(weights, dtype=np.float32)
+            batch = self._gather(indices)
+        else:
+            batch = self._gather(indices, out[:6])
+            np.copyto(out[6], weights, casting='same_kind')
+            weights = out[6]
+        return (*batch, indices, weights)
+
+    def update_priorities(self, indices: List[int], priorities: np.ndarray):
+        """Update priorities for sampled transitions"""
+        priorities = np.asarray(priorities, dtype=np.float64)
+        scaled = (priorities + 1e-6) ** self.alpha  # Small constant to avoid zero
+        if self._snapshots:
+            self._preserve(indices)
+        self.sum_tree[indices] = scaled
+        self.min_tree[indices] = scaled
+        self.max_priority = max(self.max_priority, float(priorities.max()))
 
-        # Sample indices
-        indices = np.random.choice(len(self.buffer), batch_size, p=probs)
 
-        # Get samples
-        batch = [self.buffer[i] for i in indices]
+class BufferSnapshot:
+    """
+    A buffer's state_dict() in the making (see ReplayBuffer.begin_snapshot)
 
-        states = np.array([t[0] for t in batch], dtype=np.float32)
-        actions = np.array([t[1] for t in batch], dtype=np.int64)
-        rewards = np.array([t[2] for t in batch], dtype=np.float32)
-        next_states = np.array([t[3] for t in batch], dtype=np.float32)
-        dones = np.array([t[4] for t in batch], dtype=np.float32)
+    `saved` maps each slot overwritten since the snapshot began to its
+    old contents, one value per snapshot array; it is None when there is
+    nothing to copy (empty or memory-mapped buffers).
+    """
 
-        # Calculate importance sampling weights
-        weights = (len(self.buffer) * probs[indices]) ** (-beta)
-        weights /= weights.max()
-        weights = np.array(weights, dtype=np.float32)
+    def __init__(self, header: dict, copy: bool):
+        self.header = header
+        self.size = header["size"]
+        self.saved = {} if copy else None
 
-        return states, actions, rewards, next_states, dones, indices, weights
+    def save(self, arrays: List[np.ndarray], indices):
+        """Keep the current contents of `indices` unless already saved"""
+        for idx in np.atleast_1d(indices).tolist():
+            if idx < self.size and idx not in self.saved:
+                self.saved[idx] = tuple(array[idx].copy() for array in arrays)
 
-    def update_priorities(self, indices: List[int], priorities: np.ndarray):
-        """Update priorities for sampled transitions"""
-        for idx, priority in zip(indices, priorities):
-            self.priorities[idx] = priority + 1e-6  # Small constant to avoid zero
-            self.max_priority = max(self.max_priority, priority)
 
-    def __len__(self) -> int:
-        return len(self.buffer)
+def open_replay_buffer(storage_dir: str, mode: str = "r",
+                       rng: Optional[np.random.Generator] = None) -> ReplayBuffer:
+    """
+    Reopen a memory-mapped buffer written by another process
 
-    def is_ready(self, batch_size: int) -> bool:
-        return len(self.buffer) >= batch_size
+    Capacity and buffer type come from the header, so analysis code does
+    not need the training configuration. Defaults to read-only.
+    """
+    with open(os.path.join(storage_dir, META_FILE)) as f:
+        meta = json.load(f)
+    compact = meta.get("compact", False)
+    if meta.get("prioritized"):
+        return PrioritizedReplayBuffer(meta["capacity"], alpha=meta["alpha"], rng=rng,
+                                       storage_dir=storage_dir, mode=mode, compact=compact)
+    return ReplayBuffer(meta["capacity"], rng=rng, storage_dir=storage_dir, mode=mode,
+                        compact=compact)
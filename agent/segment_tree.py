@@ -0,0 +1,114 @@
+"""
+Segment Trees for Prioritized Experience Replay
+Array-backed binary trees with O(log n) updates and prefix-sum search
+
+Reference: Schaul et al. (2016), Appendix B.2.1 - https://arxiv.org/abs/1511.05952
+"""
+
+import numpy as np
+
+
+class SegmentTree:
+    """
+    Complete binary tree stored in a flat array (root at index 1).
+
+    Leaves hold per-transition values and every internal node holds
+    `operation` over its two children.  Batch updates and queries walk
+    all requested paths level by level, so a batch of B indices costs
+    O(B log n) NumPy work instead of B Python-level tree walks.
+    """
+
+    def __init__(self, capacity: int, operation, neutral_element: float):
+        """
+        Args:
+            capacity: Number of leaves needed (rounded up to a power of 2)
+            operation: Binary NumPy ufunc combining two children
+            neutral_element: Identity of `operation` (fills empty leaves)
+        """
+        self.capacity = 1
+        while self.capacity < capacity:
+            self.capacity *= 2
+        self.operation = operation
+        self.tree = np.full(2 * self.capacity, neutral_element, dtype=np.float64)
+
+    def __setitem__(self, idx, value):
+        """Set leaf value(s) and refresh their ancestors"""
+        if np.ndim(idx) == 0:
+            self._set_one(int(idx), float(value))
+            return
+
+        nodes = np.asarray(idx, dtype=np.int64) + self.capacity
+        if nodes.size == 0:
+            return
+        self.tree[nodes] = value
+
+        nodes = np.unique(nodes >> 1)
+        while nodes[0] >= 1:
+            self.tree[nodes] = self.operation(self.tree[2 * nodes], self.tree[2 * nodes + 1])
+            nodes = np.unique(nodes >> 1)
+
+    def _set_one(self, idx: int, value: float):
+        """Scalar fast path for single-leaf updates (one push per env step)"""
+        tree = self.tree
+        node = idx + self.capacity
+        tree[node] = value
+        node >>= 1
+        while node >= 1:
+            tree[node] = self.operation(tree[2 * node], tree[2 * node + 1])
+            node >>= 1
+
+    def __getitem__(self, idx):
+        """Leaf value(s) at idx"""
+        return self.tree[np.asarray(idx) + self.capacity]
+
+    def rebuild(self):
+        """Recompute every internal node from the leaves"""
+        level = self.capacity // 2
+        while level >= 1:
+            nodes = np.arange(level, 2 * level)
+            self.tree[nodes] = self.operation(self.tree[2 * nodes], self.tree[2 * nodes + 1])
+            level //= 2
+
+
+class SumSegmentTree(SegmentTree):
+    """Segment tree of sums, used to sample proportionally to priority"""
+
+    def __init__(self, capacity: int):
+        super(SumSegmentTree, self).__init__(capacity, np.add, 0.0)
+
+    def sum(self) -> float:
+        """Sum over all leaves"""
+        return self.tree[1]
+
+    def find_prefixsum_idx(self, prefixsum: np.ndarray) -> np.ndarray:
+        """
+        Find, for each query, the lowest leaf whose prefix sum exceeds it
+
+        Args:
+            prefixsum: Array of query values in [0, sum())
+
+        Returns:
+            Array of leaf indices
+        """
+        prefixsum = np.array(prefixsum, dtype=np.float64)
+        nodes = np.ones(len(prefixsum), dtype=np.int64)
+
+        while nodes[0] < self.capacity:
+            left = 2 * nodes
+            left_sum = self.tree[left]
+            go_right = prefixsum >= left_sum
+            prefixsum -= np.where(go_right, left_sum, 0.0)
+            nodes = left + go_right
+
+        return nodes - self.capacity
+
+
+class MinSegmentTree(SegmentTree):
+    """Segment tree of minima, used for the max importance-sampling weight"""
+
+    def __init__(self, capacity: int):
+        super(MinSegmentTree, self).__init__(capacity, np.minimum, float('inf'))
+
+    def min(self) -> float:
+        """Minimum over all leaves"""
+        return self.tree[1]
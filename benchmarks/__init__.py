@@ -0,0 +1 @@
+# Benchmarks for the training hot paths
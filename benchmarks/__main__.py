@@ -0,0 +1,105 @@
+"""
+Benchmark Runner
+Runs the hot-path benchmarks and writes the results as JSON
+
+Usage:
+    python -m benchmarks                          # everything -> benchmark_results.json
+    python -m benchmarks --only env buffer --quick
+    python -m benchmarks --output results/v7.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+from datetime import datetime
+from importlib import metadata
+
+import numpy as np
+
+SUITES = ("env", "buffer", "learner", "training", "startup")
+TORCH_SUITES = ("learner", "training")
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _package_version(name: str) -> str:
+    """Installed version without importing the package"""
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return "not installed"
+
+
+def run_suite(name: str, quick: bool):
+    # Imported lazily so `--only env` never pays for torch/matplotlib setup
+    if name == "env":
+        from . import env as suite
+    elif name == "buffer":
+        from . import buffer as suite
+    elif name == "learner":
+        from . import learner as suite
+    elif name == "startup":
+        from . import startup as suite
+    else:
+        from . import training as suite
+    return suite.run(quick=quick)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Dino Jump training hot paths')
+    parser.add_argument('--only', nargs='+', choices=SUITES, default=list(SUITES),
+                       help='Suites to run')
+    parser.add_argument('--quick', action='store_true',
+                       help='Fewer iterations (smoke test, noisier numbers)')
+    parser.add_argument('--threads', type=int, default=1,
+                       help='torch intra-op threads')
+    parser.add_argument('--output', type=str, default='benchmark_results.json',
+                       help='Where to write the JSON results')
+
+    args = parser.parse_args()
+    if any(name in TORCH_SUITES for name in args.only):
+        import torch
+        torch.set_num_threads(args.threads)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "torch": _package_version("torch"),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "torch_threads": args.threads,
+            "quick": args.quick,
+        },
+        "results": {},
+    }
+
+    for name in args.only:
+        print(f"Running {name} benchmarks...")
+        start = time.perf_counter()
+        report["results"][name] = run_suite(name, args.quick)
+        print(f"  done in {time.perf_counter() - start:.1f}s")
+
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
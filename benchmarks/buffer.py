@@ -0,0 +1,79 @@
+"""
+Replay Buffer Benchmark
+Push and sample throughput and memory of ReplayBuffer / PrioritizedReplayBuffer,
+with full and compact (de-duplicated observation) storage
+"""
+
+import time
+
+import numpy as np
+
+from agent.replay_buffer import ReplayBuffer, PrioritizedReplayBuffer
+
+CAPACITIES = (10_000, 100_000, 1_000_000)
+
+
+def _fill(buffer, n: int, state_size: int = 6):
+    """Push n transitions forming one observation chain (next_state = next state)"""
+    rng = np.random.default_rng(0)
+    chunk = 100_000
+    for start in range(0, n, chunk):
+        m = min(chunk, n - start)
+        observations = rng.random((m + 1, state_size), dtype=np.float32)
+        buffer.push_batch(
+            observations[:-1],
+            rng.integers(0, 2, m),
+            rng.random(m, dtype=np.float32),
+            observations[1:],
+            rng.random(m) < 0.01,
+        )
+
+
+def bench_buffer(buffer_cls, capacity: int, pushes: int = 20000,
+                 samples: int = 2000, batch_size: int = 64, compact: bool = False) -> dict:
+    """Single-transition push rate and batch sample rate on a full buffer"""
+    buffer = buffer_cls(capacity, state_size=6, compact=compact)
+    _fill(buffer, capacity)
+
+    state = np.zeros(6, dtype=np.float32)
+    start = time.perf_counter()
+    for _ in range(pushes):
+        buffer.push(state, 1, 0.01, state, False)
+    push_elapsed = time.perf_counter() - start
+
+    prioritized = isinstance(buffer, PrioritizedReplayBuffer)
+    priorities = np.random.default_rng(0).random(batch_size)
+    start = time.perf_counter()
+    for _ in range(samples):
+        if prioritized:
+            batch = buffer.sample(batch_size, 0.4)
+            buffer.update_priorities(batch[6], priorities)
+        else:
+            buffer.sample(batch_size)
+    sample_elapsed = time.perf_counter() - start
+
+    return {
+        "buffer": buffer_cls.__name__,
+        "compact": compact,
+        "capacity": capacity,
+        "bytes_per_transition": buffer.memory_usage()["bytes_per_transition"],
+        "batch_size": batch_size,
+        "push_per_sec": pushes / push_elapsed,
+        # PER samples include the matching update_priorities call
+        "sample_per_sec": samples / sample_elapsed,
+    }
+
+
+def run(quick: bool = False) -> list:
+    capacities = CAPACITIES[:2] if quick else CAPACITIES
+    scale = 10 if quick else 1
+    return [bench_buffer(cls, capacity, pushes=20000 // scale, samples=2000 // scale,
+                         compact=compact)
+            for cls in (ReplayBuffer, PrioritizedReplayBuffer)
+            for compact in (False, True)
+            for capacity in capacities]
+
+
+if __name__ == "__main__":
+    import json
+    print(json.dumps(run(), indent=2))
@@ -0,0 +1,68 @@
+"""
+Environment Benchmark
+Headless DinoGame.step / get_state throughput and VectorDinoGame scaling
+"""
+
+import time
+
+import numpy as np
+
+from game import DinoGame, VectorDinoGame
+
+
+def bench_step(steps: int = 50000, jump_prob: float = 0.05) -> dict:
+    """Headless DinoGame.step throughput (resets included)"""
+    game = DinoGame(render=False, seed=0)
+    actions = (np.random.default_rng(0).random(steps) < jump_prob).astype(int).tolist()
+
+    start = time.perf_counter()
+    for action in actions:
+        _, _, done, _ = game.step(action)
+        if done:
+            game.reset()
+    elapsed = time.perf_counter() - start
+
+    return {"steps": steps, "steps_per_sec": steps / elapsed}
+
+
+def bench_get_state(calls: int = 50000) -> dict:
+    """Cost of a single DinoGame.get_state call"""
+    game = DinoGame(render=False, seed=0)
+    game.step(0)
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        game.get_state()
+    elapsed = time.perf_counter() - start
+
+    return {"calls": calls, "us_per_call": elapsed / calls * 1e6}
+
+
+def bench_vector_step(num_envs: int, steps: int = 2000, jump_prob: float = 0.05) -> dict:
+    """VectorDinoGame.step throughput in env steps per second"""
+    game = VectorDinoGame(num_envs, seed=0)
+    rng = np.random.default_rng(0)
+    actions = (rng.random((steps, num_envs)) < jump_prob).astype(np.int64)
+
+    start = time.perf_counter()
+    for t in range(steps):
+        game.step(actions[t])
+    elapsed = time.perf_counter() - start
+
+    return {"num_envs": num_envs, "steps": steps,
+            "env_steps_per_sec": num_envs * steps / elapsed}
+
+
+def run(quick: bool = False) -> dict:
+    scale = 10 if quick else 1
+    return {
+        "dino_game_step": bench_step(steps=50000 // scale),
+        "dino_game_get_state": bench_get_state(calls=50000 // scale),
+        "vector_dino_game_step": [bench_vector_step(n, steps=2000 // scale)
+                                  for n in (1, 16, 256)],
+    }
+
+
+if __name__ == "__main__":
+    import json
+    print(json.dumps(run(), indent=2))
@@ -0,0 +1,113 @@
+"""
+Learner Benchmark
+DQNAgent.train_step latency for eager, fused and compiled forward paths,
+optionally with batches prefetched on a sampler thread
+
+Usage:
+    python -m benchmarks.learner
+    python -m benchmarks.learner --batch-sizes 64 256 --steps 500 --compile
+    python -m benchmarks.learner --prefetch 2 --per
+"""
+
+import contextlib
+import io
+import time
+
+import numpy as np
+import torch
+
+from agent import DQNAgent
+
+BATCH_SIZES = (32, 64, 128, 256, 512, 1024)
+
+VARIANTS = {
+    "eager": dict(fused_forward=False, compile_model=False),
+    "fused": dict(fused_forward=True, compile_model=False),
+    "fused+compiled": dict(fused_forward=True, compile_model=True),
+}
+
+
+def make_agent(batch_size: int, use_per: bool = False, **kwargs) -> DQNAgent:
+    """Build a CPU agent with a replay buffer pre-filled with random transitions"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        agent = DQNAgent(state_size=6, action_size=2, batch_size=batch_size,
+                         buffer_size=max(10000, 4 * batch_size), use_per=use_per,
+                         device="cpu", **kwargs)
+
+    n = agent.memory.capacity
+    rng = np.random.default_rng(0)
+    agent.memory.push_batch(
+        rng.random((n, 6), dtype=np.float32),
+        rng.integers(0, 2, n),
+        rng.random(n, dtype=np.float32),
+        rng.random((n, 6), dtype=np.float32),
+        rng.random(n) < 0.01,
+    )
+    return agent
+
+
+def bench_train_step(batch_size: int, steps: int = 200, warmup: int = 20,
+                     use_per: bool = False, prefetch: int = 0, **agent_kwargs) -> dict:
+    """Mean and median train_step latency in milliseconds"""
+    agent = make_agent(batch_size, use_per=use_per, **agent_kwargs)
+    if prefetch:
+        agent.start_prefetch(prefetch)
+    for _ in range(warmup):
+        agent.train_step()
+
+    times = np.empty(steps)
+    for i in range(steps):
+        start = time.perf_counter()
+        agent.train_step()
+        times[i] = time.perf_counter() - start
+    agent.stop_prefetch()
+
+    return {
+        "batch_size": batch_size,
+        "mean_ms": float(times.mean() * 1e3),
+        "median_ms": float(np.median(times) * 1e3),
+        "steps_per_sec": float(steps / times.sum()),
+    }
+
+
+def run(quick: bool = False, batch_sizes=BATCH_SIZES, steps: int = 200,
+        variants=("eager", "fused"), prefetch: int = 0, use_per: bool = False) -> list:
+    """Benchmark every variant at every batch size (with and without prefetch)"""
+    if quick:
+        steps = max(1, steps // 10)
+    results = []
+    for variant in variants:
+        for k in sorted({0, prefetch}):
+            for batch_size in batch_sizes:
+                result = bench_train_step(batch_size, steps=steps, use_per=use_per,
+                                          prefetch=k, **VARIANTS[variant])
+                result["variant"] = variant + (f"+prefetch{k}" if k else "")
+                results.append(result)
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark DQNAgent.train_step')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=list(BATCH_SIZES),
+                       help='Batch sizes to measure')
+    parser.add_argument('--steps', type=int, default=200,
+                       help='Timed train steps per configuration')
+    parser.add_argument('--compile', action='store_true',
+                       help='Also measure the compiled fused path (slow to build)')
+    parser.add_argument('--threads', type=int, default=1,
+                       help='torch intra-op threads')
+    parser.add_argument('--prefetch', type=int, default=0,
+                       help='Also measure with this many prefetched batches')
+    parser.add_argument('--per', action='store_true',
+                       help='Prioritized replay')
+
+    args = parser.parse_args()
+    torch.set_num_threads(args.threads)
+
+    variants = list(VARIANTS) if args.compile else ["eager", "fused"]
+    for r in run(batch_sizes=args.batch_sizes, steps=args.steps, variants=variants,
+                 prefetch=args.prefetch, use_per=args.per):
+        print(f"{r['variant']:>15s} | batch {r['batch_size']:5d} | "
+              f"mean {r['mean_ms']:7.3f} ms | median {r['median_ms']:7.3f} ms")
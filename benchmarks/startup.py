@@ -0,0 +1,83 @@
+"""
+Startup Benchmark
+Import time of the entry points and which heavy libraries they pull in
+
+Every measurement runs in a fresh interpreter, the way a spawned actor or
+evaluation worker starts. `--check` exits non-zero if an import loads a
+library it must not (e.g. torch in a headless sim worker).
+"""
+
+import json
+import subprocess
+import sys
+import time
+
+HEAVY_MODULES = ("torch", "pygame", "matplotlib", "gymnasium")
+
+# (import statement, heavy modules it must not load)
+TARGETS = {
+    "game": ("import game; game.DinoGame(render=False).step(0)", HEAVY_MODULES),
+    "game.vector": ("from game import VectorDinoGame; VectorDinoGame(8).step([0] * 8)",
+                    HEAVY_MODULES),
+    "agent.replay_buffer": ("from agent import ReplayBuffer; ReplayBuffer(1000, state_size=6)",
+                            HEAVY_MODULES),
+    "metrics": ("import metrics", HEAVY_MODULES),
+    "train": ("import train", HEAVY_MODULES),
+    "evaluate": ("import evaluate", HEAVY_MODULES),
+    "play": ("import play", ("torch", "matplotlib", "gymnasium")),
+    "agent.DQNAgent": ("from agent import DQNAgent", ("pygame", "matplotlib", "gymnasium")),
+}
+
+_CHILD = """
+import json, sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"import_seconds": elapsed,
+                  "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(statement: str, repeats: int = 5) -> dict:
+    """Best-of-`repeats` import time of `statement` in a fresh interpreter"""
+    best_import = best_process = float("inf")
+    loaded = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        out = subprocess.run([sys.executable, "-c", _CHILD.format(statement=statement,
+                                                                  heavy=HEAVY_MODULES)],
+                             capture_output=True, text=True, check=True)
+        best_process = min(best_process, time.perf_counter() - start)
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        best_import = min(best_import, result["import_seconds"])
+        loaded = result["loaded"]
+    return {"import_ms": best_import * 1e3, "process_ms": best_process * 1e3, "loaded": loaded}
+
+
+def run(quick: bool = False) -> dict:
+    repeats = 2 if quick else 5
+    results = {}
+    for name, (statement, forbidden) in TARGETS.items():
+        result = measure(statement, repeats)
+        result["violations"] = [m for m in result["loaded"] if m in forbidden]
+        results[name] = result
+        print(f"  {name:20s} import {result['import_ms']:7.1f} ms | "
+              f"process {result['process_ms']:7.1f} ms | loaded: {result['loaded'] or '-'}")
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Entry-point import time benchmark')
+    parser.add_argument('--quick', action='store_true', help='Fewer repeats')
+    parser.add_argument('--check', action='store_true',
+                        help='Exit 1 if an import loads a forbidden heavy library')
+    args = parser.parse_args()
+
+    results = run(quick=args.quick)
+    violations = {name: r["violations"] for name, r in results.items() if r["violations"]}
+    if violations:
+        print(f"Forbidden imports: {violations}")
+        if args.check:
+            sys.exit(1)
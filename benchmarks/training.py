@@ -0,0 +1,43 @@
+"""
+End-to-End Training Benchmark
+Environment steps per second of train(), learner included
+"""
+
+import contextlib
+import io
+import tempfile
+import time
+
+from train import train
+
+
+def bench_train(num_episodes: int = 20, **train_kwargs) -> dict:
+    """Run train() in a scratch directory and report env steps per second"""
+    with tempfile.TemporaryDirectory() as model_dir:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            agent, metrics = train(num_episodes=num_episodes, model_dir=model_dir,
+                                   save_freq=num_episodes + 1, seed=0, **train_kwargs)
+        elapsed = time.perf_counter() - start
+
+    return {
+        "episodes": metrics.episodes,
+        "env_steps": agent.env_steps,
+        "train_steps": agent.steps,
+        "seconds": elapsed,
+        "env_steps_per_sec": agent.env_steps / elapsed,
+        "config": train_kwargs,
+    }
+
+
+def run(quick: bool = False) -> list:
+    episodes = 5 if quick else 20
+    return [
+        bench_train(episodes),
+        bench_train(episodes, train_every=4, learning_starts=1000),
+    ]
+
+
+if __name__ == "__main__":
+    import json
+    print(json.dumps(run(), indent=2))
@@ -0,0 +1,194 @@
+"""
+Evaluation Script
+Headless, vectorized greedy evaluation of trained checkpoints
+"""
+
+import os
+import csv
+import json
+import time
+import argparse
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+from game import VectorDinoGame
+
+
+def load_agent(model_path: str):
+    """Greedy DQNAgent for evaluation (no replay memory worth allocating)"""
+    from agent import DQNAgent
+
+    agent = DQNAgent(state_size=6, action_size=2, buffer_size=1, device="cpu")
+    agent.load(model_path)
+    agent.epsilon = 0
+    return agent
+
+
+def evaluate(model_path: str, num_episodes: int = 100, num_envs: int = 32,
+             max_steps: int = 10000, seed: Optional[int] = 0, frame_skip: int = 1) -> dict:
+    """
+    Run `num_episodes` greedy episodes of one checkpoint
+
+    Episodes are spread over a VectorDinoGame of `num_envs` games. A game
+    only starts a new episode while fewer than `num_episodes` have been
+    started, so long episodes are never cut short in favour of short ones.
+
+    With frame_skip=k the agent decides every k frames and its action is
+    repeated in between. Scores, lengths, max_steps and steps/s are still
+    counted in native frames, so results compare across frame_skip values.
+
+    Args:
+        model_path: Path to trained model
+        num_episodes: Number of episodes to evaluate
+        num_envs: Number of games stepped together
+        max_steps: Truncate episodes after this many steps
+        seed: Seed for the games (game i uses seed + i)
+        frame_skip: Frames each greedy action is repeated for
+
+    Returns:
+        Dictionary with per-episode results and summary statistics
+    """
+    agent = load_agent(model_path)
+    num_envs = min(num_envs, num_episodes)
+    game = VectorDinoGame(num_envs, seed=seed)
+    states = game.reset()
+
+    active = np.ones(num_envs, dtype=bool)
+    started = num_envs
+    episodes = []
+    total_steps = 0
+    decisions = 0
+    start_time = time.perf_counter()
+
+    while active.any():
+        actions = agent.select_actions(states, training=False)
+        decisions += int(active.sum())
+
+        for _ in range(frame_skip):
+            states, _, dones, info = game.step(actions)
+            total_steps += int(active.sum())
+
+            truncated = active & ~dones & (info["frames"] >= max_steps)
+            finished = active & (dones | truncated)
+            for i in np.flatnonzero(finished):
+                episodes.append({
+                    "model": model_path,
+                    "episode": len(episodes),
+                    "score": int(info["score"][i]),
+                    "length": int(info["frames"][i]),
+                    "obstacles_passed": int(info["obstacles_passed"][i]),
+                    "truncated": bool(truncated[i]),
+                })
+                if started < num_episodes:
+                    started += 1
+                else:
+                    active[i] = False
+            if truncated.any():
+                states = game.reset_envs(np.flatnonzero(truncated))
+            if finished.any():
+                # A fresh episode runs (action 0) until the agent's next decision
+                actions = np.where(finished, 0, actions)
+            if not active.any():
+                break
+
+    elapsed = time.perf_counter() - start_time
+    game.close()
+
+    scores = np.array([e["score"] for e in episodes], dtype=np.float64)
+    lengths = np.array([e["length"] for e in episodes], dtype=np.float64)
+    summary = {
+        "model": model_path,
+        "episodes": len(episodes),
+        "score_mean": float(scores.mean()),
+        "score_median": float(np.median(scores)),
+        "score_p5": float(np.percentile(scores, 5)),
+        "score_p95": float(np.percentile(scores, 95)),
+        "score_max": float(scores.max()),
+        "length_mean": float(lengths.mean()),
+        "length_median": float(np.median(lengths)),
+        "truncated": int(sum(e["truncated"] for e in episodes)),
+        "frame_skip": frame_skip,
+        "decisions": decisions,
+        "steps": total_steps,
+        "seconds": elapsed,
+        "steps_per_sec": total_steps / elapsed if elapsed > 0 else float("inf"),
+    }
+    return {"summary": summary, "episodes": episodes}
+
+
+def _evaluate_job(args):
+    return evaluate(*args)
+
+
+def evaluate_many(model_paths: List[str], num_episodes: int = 100, num_envs: int = 32,
+                  max_steps: int = 10000, seed: Optional[int] = 0,
+                  workers: int = 1, frame_skip: int = 1) -> List[dict]:
+    """Evaluate several checkpoints, one worker process per checkpoint"""
+    jobs = [(path, num_episodes, num_envs, max_steps, seed, frame_skip)
+            for path in model_paths]
+    if workers <= 1 or len(jobs) == 1:
+        return [evaluate(*job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_evaluate_job, jobs))
+
+
+def write_results(results: List[dict], output: str):
+    """Write per-episode results to CSV or JSON (chosen by file extension)"""
+    if output.endswith(".json"):
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2)
+        return
+
+    fields = ["model", "episode", "score", "length", "obstacles_passed", "truncated"]
+    with open(output, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        for result in results:
+            writer.writerows(result["episodes"])
+
+
+def print_summary(summary: dict):
+    print(f"{summary['model']}: "
+          f"score mean {summary['score_mean']:.1f} | median {summary['score_median']:.1f} | "
+          f"p5 {summary['score_p5']:.1f} | p95 {summary['score_p95']:.1f} | "
+          f"length {summary['length_mean']:.0f} | "
+          f"{summary['steps_per_sec']:,.0f} steps/s ({summary['episodes']} episodes, "
+          f"{summary['truncated']} truncated)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluate Dino Jump checkpoints headless")
+    parser.add_argument("models", nargs="+", help="Checkpoint path(s)")
+    parser.add_argument("--episodes", type=int, default=100,
+                        help="Episodes per checkpoint")
+    parser.add_argument("--num-envs", type=int, default=32,
+                        help="Games stepped together per checkpoint")
+    parser.add_argument("--max-steps", type=int, default=10000,
+                        help="Truncate episodes after this many steps")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="Game seed (same episodes for every checkpoint)")
+    parser.add_argument("--frame-skip", type=int, default=1,
+                        help="Repeat each greedy action for this many frames")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Evaluate checkpoints in this many processes")
+    parser.add_argument("--output", type=str, default=None,
+                        help="Per-episode results file (.csv or .json)")
+
+    args = parser.parse_args()
+
+    missing = [path for path in args.models if not os.path.exists(path)]
+    if missing:
+        parser.error(f"Model not found: {', '.join(missing)}")
+
+    results = evaluate_many(args.models, num_episodes=args.episodes, num_envs=args.num_envs,
+                            max_steps=args.max_steps, seed=args.seed, workers=args.workers,
+                            frame_skip=args.frame_skip)
+
+    print("\n" + "=" * 50)
+    for result in results:
+        print_summary(result["summary"])
+
+    if args.output:
+        write_results(results, args.output)
+        print(f"Per-episode results saved to {args.output}")
@@ -1,3 +1,25 @@
 # Game module
-from .dino_game import DinoGame
+# Constants are plain values; classes are imported on first access (PEP 562)
+# so headless workers load only numpy, never pygame or gymnasium.
+import importlib
+
 from .constants import *
+
+_LAZY_EXPORTS = {
+    "DinoGame": ".dino_game",
+    "VectorDinoGame": ".vector_game",
+    "DinoEnv": ".gym_env",
+    "make_vector_env": ".vector_env",
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY_EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
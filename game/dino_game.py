@@ -5,12 +5,154 @@ Based on insights from open source projects:
 - https://github.com/hfahrudin/trex-DQN
 """
 
-import pygame
-import random
+import math
 import numpy as np
+from collections import deque
+from functools import lru_cache
+from typing import Optional
 from .constants import *
 
 
+def _aabb_overlap(a, b):
+    """pygame.Rect.colliderect semantics for (x, y, w, h) int tuples"""
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    return ax < bx + bw and ay < by + bh and ax + aw > bx and ay + ah > by
+
+
+# ---- jump-timing physics ----
+# From JUMP_VELOCITY=-18, GRAVITY=1.2, DINO_HEIGHT=50:
+#   Dino bottom at frame f = 320 - 17.4f + 0.6f²
+#   Safe when bottom < GROUND_Y - obs_height
+#   → 0.6f² - 17.4f + obs_height < 0
+# Solved via quadratic formula for continuous, height-dependent windows.
+# The frame window depends only on the height, so it is cached per height;
+# the distance window is the frame window scaled by the (exact) speed.
+_DANGER_ZONE = DINO_WIDTH + OBSTACLE_WIDTH   # 60 px
+
+
+@lru_cache(maxsize=256)
+def _jump_frame_window(h):
+    """Safe jump-start window (first_safe, last_safe) in frames for height h.
+
+    Returns None when no jump can clear an obstacle of this height.
+
+    Physics (quadratic):
+      0.6 f² − 17.4 f + h < 0
+      f = (17.4 ± √(302.76 − 2.4 h)) / 1.2
+
+    Safety margin (frames, each side):
+      margin = h / 25          (h=30 → 1.2,  h=50 → 2.0)
+    """
+    h = max(h, 1)   # avoid division by zero
+    discriminant = 302.76 - 2.4 * h
+    if discriminant <= 0:
+        return None              # obstacle too tall to ever clear
+
+    sqrt_d = math.sqrt(discriminant)
+    f_first_raw = (17.4 - sqrt_d) / 1.2   # earliest safe frame
+    f_last_raw  = (17.4 + sqrt_d) / 1.2   # latest safe frame
+
+    # Height-proportional safety margin (in frames).
+    # Taller obstacles → bigger margin → tighter window.
+    margin = h / 25.0        # h=30→1.2  h=40→1.6  h=50→2.0
+
+    first_safe = f_first_raw + margin
+    last_safe  = f_last_raw  - margin
+
+    if last_safe <= first_safe:
+        return None
+    return first_safe, last_safe
+
+
+# Array form of the window table for vectorized lookups, indexed by height
+# (obstacle heights are integers in [0, OBSTACLE_MAX_HEIGHT]).
+_WINDOWS = [_jump_frame_window(h) for h in range(OBSTACLE_MAX_HEIGHT + 1)]
+_WINDOW_VALID = np.array([w is not None for w in _WINDOWS])
+_FIRST_SAFE = np.array([w[0] if w else 0.0 for w in _WINDOWS])
+_LAST_SAFE = np.array([w[1] if w else 0.0 for w in _WINDOWS])
+
+
+def _airtime_frames():
+    """Frames from jump start until the Dino is back on the ground"""
+    y, velocity, frames = 0.0, JUMP_VELOCITY, 0
+    while True:
+        velocity += GRAVITY
+        y += velocity
+        frames += 1
+        if y >= 0:
+            return frames
+
+
+# ---- inert frames (see DinoGame.step_until_decision) ----
+# A jump started while the nearest obstacle is farther than the Dino can
+# travel in one airtime at top speed lands before the obstacle arrives:
+# the trajectory is unchanged and the jump only earns its penalty.  Such
+# frames, and all airborne frames (jump() is a no-op), are inert.
+_AIRTIME_FRAMES = _airtime_frames()                            # 30
+_INERT_DISTANCE = _AIRTIME_FRAMES * OBSTACLE_SPEED_MAX         # 300 px
+_SURVIVAL_REWARD = 0.01
+
+
+def jump_timing_quality(dist, obs_height, speed):
+    """Return a value in [-1, 1] rating the jump timing.
+
+    Uses the cached safe-frame window for the given *obs_height*
+    (see _jump_frame_window) converted to a distance window at *speed*.
+
+    Returns:
+      +1.0  at optimal distance
+       0.0  at the edges of the safe window
+      -1.0  far outside the window
+    """
+    window = _jump_frame_window(obs_height)
+    if window is None:
+        return -1.0
+    first_safe, last_safe = window
+
+    # Convert frame window to distance window
+    d_min = first_safe * speed
+    d_max = last_safe  * speed - _DANGER_ZONE
+    if d_max <= d_min:
+        d_max = d_min + 1
+
+    d_optimal   = (d_min + d_max) / 2.0
+    half_window = (d_max - d_min) / 2.0
+    if half_window < 1:
+        half_window = 1.0
+
+    # Normalised error: 0 at optimal, 1 at edges, >1 outside
+    error = abs(dist - d_optimal) / half_window
+
+    # Smooth quality: 1 → 0 → −1
+    quality = 1.0 - error
+    return max(-1.0, min(1.0, quality))
+
+
+def jump_timing_quality_batch(dist, obs_height, speed):
+    """Array version of jump_timing_quality (same operations, same results).
+
+    Args:
+        dist, obs_height, speed: broadcastable arrays; heights must lie
+            in [0, OBSTACLE_MAX_HEIGHT]
+    """
+    h = np.maximum(obs_height, 1)
+    first_safe = _FIRST_SAFE[h]
+    last_safe = _LAST_SAFE[h]
+
+    d_min = first_safe * speed
+    d_max = last_safe * speed - _DANGER_ZONE
+    d_max = np.where(d_max <= d_min, d_min + 1, d_max)
+
+    d_optimal = (d_min + d_max) / 2.0
+    half_window = (d_max - d_min) / 2.0
+    half_window = np.where(half_window < 1, 1.0, half_window)
+
+    error = np.abs(dist - d_optimal) / half_window
+    quality = np.clip(1.0 - error, -1.0, 1.0)
+    return np.where(_WINDOW_VALID[h], quality, -1.0)
+
+
 class Dino:
     """Player character"""
 
@@ -37,25 +179,18 @@ class Dino:
             self.is_jumping = False
 
     def get_rect(self):
-        return pygame.Rect(self.x, self.y, self.width, self.height)
-
-    def draw(self, screen):
-        rect = self.get_rect()
-        pygame.draw.rect(screen, GRAY, rect)
-        eye_x = rect.x + rect.width - 10
-        eye_y = rect.y + 8
-        pygame.draw.circle(screen, WHITE, (eye_x, eye_y), 4)
-        pygame.draw.circle(screen, BLACK, (eye_x + 1, eye_y), 2)
+        """Integer (x, y, w, h) bounding box, truncated like pygame.Rect"""
+        return (int(self.x), int(self.y), self.width, self.height)
 
 
 class Obstacle:
     """Obstacle"""
 
-    def __init__(self, x: float, speed: float):
+    def __init__(self, x: float, speed: float, height: int):
         self.x = x
         self.speed = speed
         self.width = OBSTACLE_WIDTH
-        self.height = random.randint(OBSTACLE_MIN_HEIGHT, OBSTACLE_MAX_HEIGHT)
+        self.height = height
         self.y = GROUND_Y - self.height
         self.passed = False
 
@@ -63,10 +198,8 @@ class Obstacle:
         self.x -= self.speed
 
     def get_rect(self):
-        return pygame.Rect(self.x, self.y, self.width, self.height)
-
-    def draw(self, screen):
-        pygame.draw.rect(screen, GREEN, self.get_rect())
+        """Integer (x, y, w, h) bounding box, truncated like pygame.Rect"""
+        return (int(self.x), int(self.y), self.width, self.height)
 
 
 class DinoGame:
@@ -76,23 +209,39 @@ class DinoGame:
     Key insight from aome510/chrome-dino-game-rl:
     "The reward is defined to be the number of obstacles that the agent passes"
     Simple reward = better learning
+
+    The simulation itself is pure Python; pygame is only imported
+    (via PygameRenderer) when render=True.
+
+    All obstacles move at the same speed, so spawn order is position
+    order: `obstacles` is a deque kept sorted by x, with cursors to the
+    first not-yet-passed and first still-ahead obstacle, making nearest
+    lookup, culling and spawning O(1).
+
+    Obstacle heights and gaps come from a per-instance
+    numpy.random.Generator, so the same seed and actions always give
+    the same trajectory, independent of any other game or global RNG.
     """
 
-    def __init__(self, render: bool = True):
+    def __init__(self, render: bool = True, seed: Optional[int] = None):
         self.render_game = render
+        self.renderer = None
 
         if render:
-            pygame.init()
-            self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-            pygame.display.set_caption("Dino Jump - Q-Learning v6.1 (Clean)")
-            self.clock = pygame.time.Clock()
-            self.font = pygame.font.Font(None, 36)
+            from .renderer import PygameRenderer
+            self.renderer = PygameRenderer()
 
-        self.reset()
+        self.reset(seed=seed)
+
+    def reset(self, seed: Optional[int] = None):
+        """Start a new game; a seed re-seeds this game's RNG first"""
+        if seed is not None or not hasattr(self, "rng"):
+            self.rng = np.random.default_rng(seed)
 
-    def reset(self):
         self.dino = Dino()
-        self.obstacles = []
+        self.obstacles = deque()
+        self._pass_idx = 0     # obstacles[:_pass_idx] have been passed
+        self._ahead_idx = 0    # obstacles[:_ahead_idx] are behind the Dino
         self.score = 0
         self.speed = OBSTACLE_SPEED_INIT
         self.game_over = False
@@ -106,11 +255,12 @@ class DinoGame:
         if len(self.obstacles) == 0:
             x = WINDOW_WIDTH
         else:
-            last_x = max(obs.x for obs in self.obstacles)
-            gap = random.randint(OBSTACLE_GAP_MIN, OBSTACLE_GAP_MAX)
+            last_x = self.obstacles[-1].x   # newest obstacle is the rightmost
+            gap = int(self.rng.integers(OBSTACLE_GAP_MIN, OBSTACLE_GAP_MAX + 1))
             x = last_x + gap
 
-        obstacle = Obstacle(x, self.speed)
+        height = int(self.rng.integers(OBSTACLE_MIN_HEIGHT, OBSTACLE_MAX_HEIGHT + 1))
+        obstacle = Obstacle(x, self.speed, height)
         self.obstacles.append(obstacle)
 
     def get_state(self):
@@ -130,11 +280,7 @@ class DinoGame:
         state = np.zeros(6, dtype=np.float32)
 
         # Find nearest obstacle ahead of (or overlapping) the Dino
-        nearest_obs = None
-        for obs in sorted(self.obstacles, key=lambda o: o.x):
-            if obs.x + obs.width > self.dino.x:
-                nearest_obs = obs
-                break
+        nearest_obs = self._nearest_ahead()
 
         if nearest_obs:
             # Distance to obstacle (normalized 0-1, where 0 = very close)
@@ -162,24 +308,184 @@ class DinoGame:
 
         return state
 
+    def _nearest_ahead(self):
+        """Leftmost obstacle ahead of (or overlapping) the Dino, or None.
+
+        Obstacles only move left, so the cursor only moves forward
+        (amortized O(1)).
+        """
+        obstacles = self.obstacles
+        idx = self._ahead_idx
+        while idx < len(obstacles) and obstacles[idx].x + obstacles[idx].width <= self.dino.x:
+            idx += 1
+        self._ahead_idx = idx
+        return obstacles[idx] if idx < len(obstacles) else None
+
     def _get_nearest_obstacle(self):
         """Get (distance, height) to nearest obstacle ahead of Dino.
 
         Returns (float('inf'), 0) when there is no obstacle ahead.
         """
-        dino_right = self.dino.x + self.dino.width
-        best_dist = float('inf')
-        best_height = 0
-        for obs in self.obstacles:
-            if obs.x + obs.width > self.dino.x:
-                dist = obs.x - dino_right
-                if dist < best_dist:
-                    best_dist = dist
-                    best_height = obs.height
-        return best_dist, best_height
+        obs = self._nearest_ahead()
+        if obs is None:
+            return float('inf'), 0
+        return obs.x - (self.dino.x + self.dino.width), obs.height
 
     def step(self, action: int):
         """Execute one game step"""
+        reward = self._advance(action)
+
+        if self.render_game:
+            self._render()
+
+        return self.get_state(), reward, self.game_over, self._info()
+
+    def _info(self):
+        return {
+            "score": self.score,
+            "frames": self.frames_survived,
+            "obstacles_passed": self.obstacles_passed
+        }
+
+    def step_repeat(self, action: int, frame_skip: int, gamma: float = 1.0):
+        """
+        Repeat `action` for up to `frame_skip` frames (action repeat)
+
+        Stops early when the game ends. A repeated jump re-triggers as soon
+        as the Dino lands, as if the key were held.
+
+        Args:
+            action: Action to repeat
+            frame_skip: Frames per call (k)
+            gamma: Per-frame discount within the call (1.0 = plain sum)
+
+        Returns:
+            state, reward, done, info - reward is sum_i gamma^i r_i over
+            the frames played (info["n_steps"]), so next_state
+            bootstraps with gamma ** n_steps
+        """
+        reward, discount, frames = 0.0, 1.0, 0
+        while frames < frame_skip and not self.game_over:
+            reward += discount * self._advance(action)
+            discount *= gamma
+            frames += 1
+            if self.render_game:
+                self._render()
+
+        info = self._info()
+        info["n_steps"] = frames
+        return self.get_state(), reward, self.game_over, info
+
+    def step_until_decision(self, action: int, gamma: float, max_frames: Optional[int] = None):
+        """
+        Execute `action`, then fast-forward through inert frames
+
+        Frames where the action cannot matter (airborne, or grounded with
+        the nearest obstacle beyond _INERT_DISTANCE) are played with
+        action 0 and no observation is built. Grounded inert stretches
+        are advanced analytically; event frames (pass, cull, spawn) and
+        airborne frames run the regular frame code, so the trajectory is
+        exactly the one step() would produce with those actions.
+
+        Args:
+            action: Action for the first frame
+            gamma: Discount applied within the aggregated transition
+            max_frames: Upper bound on frames per call
+
+        Returns:
+            state, reward, done, info - reward is the discounted sum
+            sum_i gamma^i r_i over the k frames played (info["n_steps"]
+            = k), so next_state bootstraps with gamma ** k
+        """
+        reward = self._advance(action)
+        frames, discount = 1, gamma
+        if self.render_game:
+            self._render()
+
+        while not self.game_over and (max_frames is None or frames < max_frames):
+            limit = None if max_frames is None else max_frames - frames
+            if self.dino.is_jumping or self.render_game:
+                if not self.dino.is_jumping and self._nearest_distance() <= _INERT_DISTANCE:
+                    break
+                n = 1
+                r = self._advance(0)
+                if self.render_game:
+                    self._render()
+            else:
+                n = self._fast_forward_ground(limit)
+                if n == 0:
+                    break
+                if n == -1:          # next frame is an event frame
+                    n, r = 1, self._advance(0)
+                else:
+                    r = _SURVIVAL_REWARD * (n if gamma == 1 else (1 - gamma ** n) / (1 - gamma))
+            reward += discount * r
+            discount *= gamma ** n
+            frames += n
+
+        info = self._info()
+        info["n_steps"] = frames
+        return self.get_state(), reward, self.game_over, info
+
+    def _nearest_distance(self):
+        obs = self._nearest_ahead()
+        return float('inf') if obs is None else obs.x - (self.dino.x + self.dino.width)
+
+    def _fast_forward_ground(self, limit: Optional[int]) -> int:
+        """
+        Analytically advance grounded, inert, event-free frames
+
+        Obstacles move by the same per-frame speeds step() would apply
+        (np.subtract.accumulate subtracts them one by one, matching the
+        per-frame float arithmetic); the grounded Dino does not move.
+
+        Returns:
+            Frames advanced; 0 if the current frame is a decision frame,
+            -1 if the next frame has a pass/cull event (run it normally)
+        """
+        dist = self._nearest_distance()
+        if dist <= _INERT_DISTANCE:
+            return 0
+
+        # Speeds are non-decreasing, so the nearest obstacle reaches the
+        # decision distance within this many frames
+        horizon = int((dist - _INERT_DISTANCE) // self.speed) + 2
+        if limit is not None:
+            horizon = min(horizon, limit)
+        f0 = self.frames_survived
+        ramp = np.minimum(OBSTACLE_SPEED_MAX,
+                          OBSTACLE_SPEED_INIT + np.arange(f0, f0 + horizon - 1) * SPEED_INCREMENT)
+        speeds = np.concatenate(([self.speed], ramp))
+
+        obstacles = self.obstacles
+        start_x = np.array([obs.x for obs in obstacles], dtype=np.float64)
+        xs = np.subtract.accumulate(
+            np.vstack([start_x, np.broadcast_to(speeds[:, None], (horizon, len(obstacles)))]),
+            axis=0)[1:]                                     # xs[j - 1] = positions after j frames
+
+        # First frame whose start is no longer inert (frames 1..n are inert)
+        nearest = xs[:, self._ahead_idx] - (self.dino.x + self.dino.width)
+        decision = np.flatnonzero(nearest <= _INERT_DISTANCE)
+        n = int(decision[0]) + 1 if decision.size else horizon
+
+        # First frame with a pass or cull event
+        unpassed = xs[:, self._pass_idx:] + OBSTACLE_WIDTH < self.dino.x
+        events = np.flatnonzero(unpassed.any(axis=1) | (xs[:, 0] <= -100))
+        if events.size:
+            if events[0] == 0:
+                return -1
+            n = min(n, int(events[0]))
+
+        for obs, x in zip(obstacles, xs[n - 1]):
+            obs.x = float(x)
+            obs.speed = float(speeds[n - 1])
+        self.speed = min(OBSTACLE_SPEED_MAX,
+                         OBSTACLE_SPEED_INIT + (f0 + n - 1) * SPEED_INCREMENT)
+        self.frames_survived = f0 + n
+        return n
+
+    def _advance(self, action: int):
+        """Simulate one frame and return its reward"""
         # Track whether a new jump was initiated this frame
         was_grounded = not self.dino.is_jumping
 
@@ -197,15 +503,21 @@ class DinoGame:
             obs.speed = self.speed
             obs.update()
 
-        # Check passed obstacles
+        # Check passed obstacles (they are passed in spawn order)
         passed = 0
-        for obs in self.obstacles:
-            if not obs.passed and obs.x + obs.width < self.dino.x:
-                obs.passed = True
-                passed += 1
+        while self._pass_idx < len(self.obstacles):
+            obs = self.obstacles[self._pass_idx]
+            if obs.x + obs.width >= self.dino.x:
+                break
+            obs.passed = True
+            passed += 1
+            self._pass_idx += 1
 
-        # Remove off-screen
-        self.obstacles = [obs for obs in self.obstacles if obs.x > -100]
+        # Remove off-screen (always the oldest, already-passed obstacles)
+        while self.obstacles and self.obstacles[0].x <= -100:
+            self.obstacles.popleft()
+            self._pass_idx -= 1
+            self._ahead_idx = max(0, self._ahead_idx - 1)
 
         # Update score
         if passed > 0:
@@ -220,7 +532,7 @@ class DinoGame:
         collision = False
         dino_rect = self.dino.get_rect()
         for obs in self.obstacles:
-            if dino_rect.colliderect(obs.get_rect()):
+            if _aabb_overlap(dino_rect, obs.get_rect()):
                 collision = True
                 self.game_over = True
                 break
@@ -233,82 +545,11 @@ class DinoGame:
                         OBSTACLE_SPEED_INIT + self.frames_survived * SPEED_INCREMENT)
 
         self.frames_survived += 1
-
-        if self.render_game:
-            self._render()
-
-        return self.get_state(), reward, self.game_over, {
-            "score": self.score,
-            "frames": self.frames_survived,
-            "obstacles_passed": self.obstacles_passed
-        }
-
-    # ---- jump-timing physics constants ----
-    # From JUMP_VELOCITY=-18, GRAVITY=1.2, DINO_HEIGHT=50:
-    #   Dino bottom at frame f = 320 - 17.4f + 0.6f²
-    #   Safe when bottom < GROUND_Y - obs_height
-    #   → 0.6f² - 17.4f + obs_height < 0
-    # Solved via quadratic formula for continuous, height-dependent windows.
-    _DANGER_ZONE = DINO_WIDTH + OBSTACLE_WIDTH   # 60 px
+        return reward
 
     def _jump_timing_quality(self, dist, obs_height):
-        """Return a value in [-1, 1] rating the jump timing.
-
-        Uses continuous physics to compute the exact safe-frame window
-        for the given *obs_height*, then adds a height-proportional
-        safety margin so that taller obstacles require more precise
-        timing (tighter window).
-
-        Physics (quadratic):
-          0.6 f² − 17.4 f + h < 0
-          f = (17.4 ± √(302.76 − 2.4 h)) / 1.2
-
-        Safety margin (frames, each side):
-          margin = h / 25          (h=30 → 1.2,  h=50 → 2.0)
-
-        Returns:
-          +1.0  at optimal distance
-           0.0  at the edges of the safe window
-          -1.0  far outside the window
-        """
-        import math
-
-        h = max(obs_height, 1)   # avoid division by zero
-        discriminant = 302.76 - 2.4 * h
-        if discriminant <= 0:
-            return -1.0          # obstacle too tall to ever clear
-
-        sqrt_d = math.sqrt(discriminant)
-        f_first_raw = (17.4 - sqrt_d) / 1.2   # earliest safe frame
-        f_last_raw  = (17.4 + sqrt_d) / 1.2   # latest safe frame
-
-        # Height-proportional safety margin (in frames).
-        # Taller obstacles → bigger margin → tighter window.
-        margin = h / 25.0        # h=30→1.2  h=40→1.6  h=50→2.0
-
-        first_safe = f_first_raw + margin
-        last_safe  = f_last_raw  - margin
-
-        if last_safe <= first_safe:
-            return -1.0
-
-        # Convert frame window to distance window
-        d_min = first_safe * self.speed
-        d_max = last_safe  * self.speed - self._DANGER_ZONE
-        if d_max <= d_min:
-            d_max = d_min + 1
-
-        d_optimal   = (d_min + d_max) / 2.0
-        half_window = (d_max - d_min) / 2.0
-        if half_window < 1:
-            half_window = 1.0
-
-        # Normalised error: 0 at optimal, 1 at edges, >1 outside
-        error = abs(dist - d_optimal) / half_window
-
-        # Smooth quality: 1 → 0 → −1
-        quality = 1.0 - error
-        return max(-1.0, min(1.0, quality))
+        """Rate the jump timing at the current speed (see jump_timing_quality)"""
+        return jump_timing_quality(dist, obs_height, self.speed)
 
     def _calculate_reward(self, collision, passed, jumped_this_frame=False):
         """
@@ -346,40 +587,14 @@ class DinoGame:
         return 0.01
 
     def _render(self):
-        self.screen.fill(WHITE)
-        pygame.draw.line(self.screen, BLACK, (0, GROUND_Y), (WINDOW_WIDTH, GROUND_Y), 2)
-        self.dino.draw(self.screen)
-        for obs in self.obstacles:
-            obs.draw(self.screen)
-
-        score_text = self.font.render(f"Score: {self.score}", True, BLACK)
-        self.screen.blit(score_text, (WINDOW_WIDTH - 150, 20))
-
-        if self.game_over:
-            game_over_text = self.font.render("GAME OVER - Press R to restart", True, RED)
-            text_rect = game_over_text.get_rect(center=(WINDOW_WIDTH//2, WINDOW_HEIGHT//2))
-            self.screen.blit(game_over_text, text_rect)
-
-        pygame.display.flip()
-        self.clock.tick(FPS)
+        self.renderer.draw(self)
 
     def handle_human_input(self):
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                return False, None
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_r:
-                    self.reset()
-                if event.key == pygame.K_ESCAPE:
-                    return False, None
-
-        keys = pygame.key.get_pressed()
-        action = 1 if keys[pygame.K_SPACE] or keys[pygame.K_UP] or keys[pygame.K_w] else 0
-        return True, action
+        return self.renderer.handle_human_input(self)
 
     def close(self):
         if self.render_game:
-            pygame.quit()
+            self.renderer.close()
 
 
 if __name__ == "__main__":
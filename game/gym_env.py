@@ -0,0 +1,128 @@
+"""
+Gymnasium Adapter for Dino Jump
+DinoGame behind the standard reset()/step() 5-tuple API with declared spaces
+
+gymnasium is optional: when it is installed DinoEnv subclasses
+gymnasium.Env and uses gymnasium.spaces, otherwise minimal local Box /
+Discrete spaces with the same attributes are used.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+from .constants import FPS
+from .dino_game import DinoGame
+
+try:
+    import gymnasium
+    from gymnasium.spaces import Box, Discrete
+    _EnvBase = gymnasium.Env
+except ImportError:
+    gymnasium = None
+    _EnvBase = object
+
+    class Box:
+        """Minimal stand-in for gymnasium.spaces.Box"""
+
+        def __init__(self, low, high, shape=None, dtype=np.float32, seed=None):
+            self.dtype = np.dtype(dtype)
+            self.shape = tuple(shape) if shape is not None else np.shape(low)
+            self.low = np.broadcast_to(np.asarray(low, dtype=self.dtype), self.shape).copy()
+            self.high = np.broadcast_to(np.asarray(high, dtype=self.dtype), self.shape).copy()
+            self.np_random = np.random.default_rng(seed)
+
+        def sample(self):
+            return self.np_random.uniform(self.low, self.high).astype(self.dtype)
+
+        def contains(self, x) -> bool:
+            x = np.asarray(x)
+            return x.shape == self.shape and bool(np.all((x >= self.low) & (x <= self.high)))
+
+        def __repr__(self):
+            return f"Box({self.low}, {self.high}, {self.shape}, {self.dtype})"
+
+    class Discrete:
+        """Minimal stand-in for gymnasium.spaces.Discrete"""
+
+        def __init__(self, n: int, seed=None):
+            self.n = n
+            self.shape = ()
+            self.dtype = np.dtype(np.int64)
+            self.np_random = np.random.default_rng(seed)
+
+        def sample(self) -> int:
+            return int(self.np_random.integers(self.n))
+
+        def contains(self, x) -> bool:
+            return isinstance(x, (int, np.integer)) and 0 <= x < self.n
+
+        def __repr__(self):
+            return f"Discrete({self.n})"
+
+
+class DinoEnv(_EnvBase):
+    """
+    Gymnasium-style Dino Jump environment
+
+    Observation: the 6-dim DinoGame.get_state() vector (float32)
+    Actions: 0 = run, 1 = jump
+    Episodes terminate on collision and are truncated after
+    `max_episode_steps` steps (if set). With frame_skip=k every step
+    repeats the action for k frames and returns the summed reward.
+    """
+
+    metadata = {"render_modes": ["human"], "render_fps": FPS}
+
+    def __init__(self, render_mode: Optional[str] = None,
+                 max_episode_steps: Optional[int] = None, seed: Optional[int] = None,
+                 frame_skip: int = 1):
+        """
+        Args:
+            render_mode: None (headless) or "human" (pygame window)
+            max_episode_steps: Truncate episodes after this many steps
+            seed: Seed for the underlying game's RNG
+            frame_skip: Frames each action is repeated for
+        """
+        if render_mode not in (None, "human"):
+            raise ValueError(f"Unsupported render_mode: {render_mode!r}")
+        self.render_mode = render_mode
+        self.max_episode_steps = max_episode_steps
+        self.frame_skip = frame_skip
+
+        # Velocity/20 stays within [-1, 1]; every other feature is in [0, 1]
+        self.observation_space = Box(
+            low=np.array([0, 0, 0, -1, 0, 0], dtype=np.float32),
+            high=np.ones(6, dtype=np.float32),
+            dtype=np.float32,
+        )
+        self.action_space = Discrete(2)
+
+        self.game = DinoGame(render=render_mode == "human", seed=seed)
+        self._elapsed_steps = 0
+
+    def reset(self, *, seed: Optional[int] = None, options: Optional[dict] = None):
+        """Start a new episode; returns (observation, info)"""
+        if gymnasium is not None:
+            super().reset(seed=seed)
+        self._elapsed_steps = 0
+        obs = self.game.reset(seed=seed)
+        return obs, {"score": 0, "frames": 0, "obstacles_passed": 0}
+
+    def step(self, action):
+        """Returns (observation, reward, terminated, truncated, info)"""
+        if self.frame_skip > 1:
+            obs, reward, done, info = self.game.step_repeat(int(action), self.frame_skip)
+        else:
+            obs, reward, done, info = self.game.step(int(action))
+        self._elapsed_steps += 1
+        truncated = (not done and self.max_episode_steps is not None
+                     and self._elapsed_steps >= self.max_episode_steps)
+        return obs, float(reward), bool(done), bool(truncated), info
+
+    def render(self):
+        # Human rendering happens inside DinoGame.step when enabled
+        return None
+
+    def close(self):
+        self.game.close()
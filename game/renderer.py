@@ -0,0 +1,64 @@
+"""
+Pygame Renderer for Dino Jump
+Window, drawing and keyboard input layered on top of the headless DinoGame
+"""
+
+import pygame
+from .constants import *
+
+
+class PygameRenderer:
+    """Draws a DinoGame each frame and reads human keyboard input"""
+
+    def __init__(self):
+        pygame.init()
+        self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+        pygame.display.set_caption("Dino Jump - Q-Learning v6.1 (Clean)")
+        self.clock = pygame.time.Clock()
+        self.font = pygame.font.Font(None, 36)
+
+    def draw_dino(self, dino):
+        rect = pygame.Rect(dino.get_rect())
+        pygame.draw.rect(self.screen, GRAY, rect)
+        eye_x = rect.x + rect.width - 10
+        eye_y = rect.y + 8
+        pygame.draw.circle(self.screen, WHITE, (eye_x, eye_y), 4)
+        pygame.draw.circle(self.screen, BLACK, (eye_x + 1, eye_y), 2)
+
+    def draw_obstacle(self, obstacle):
+        pygame.draw.rect(self.screen, GREEN, pygame.Rect(obstacle.get_rect()))
+
+    def draw(self, game):
+        self.screen.fill(WHITE)
+        pygame.draw.line(self.screen, BLACK, (0, GROUND_Y), (WINDOW_WIDTH, GROUND_Y), 2)
+        self.draw_dino(game.dino)
+        for obs in game.obstacles:
+            self.draw_obstacle(obs)
+
+        score_text = self.font.render(f"Score: {game.score}", True, BLACK)
+        self.screen.blit(score_text, (WINDOW_WIDTH - 150, 20))
+
+        if game.game_over:
+            game_over_text = self.font.render("GAME OVER - Press R to restart", True, RED)
+            text_rect = game_over_text.get_rect(center=(WINDOW_WIDTH//2, WINDOW_HEIGHT//2))
+            self.screen.blit(game_over_text, text_rect)
+
+        pygame.display.flip()
+        self.clock.tick(FPS)
+
+    def handle_human_input(self, game):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return False, None
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_r:
+                    game.reset()
+                if event.key == pygame.K_ESCAPE:
+                    return False, None
+
+        keys = pygame.key.get_pressed()
+        action = 1 if keys[pygame.K_SPACE] or keys[pygame.K_UP] or keys[pygame.K_w] else 0
+        return True, action
+
+    def close(self):
+        pygame.quit()
@@ -0,0 +1,245 @@
+"""
+Vector Environments for DinoEnv
+Step many Gymnasium-style environments as one batch, in-process or in subprocesses
+
+Both wrappers auto-reset finished environments inside step(): the returned
+observation row is the first observation of the next episode, and the last
+observation of the finished one is in infos["final_observation"] (rows
+where infos["_final"] is True).  Per-env info entries (score, frames,
+obstacles_passed and n_steps, the frames the step covered) come back as
+(num_envs,) arrays.
+
+AsyncVectorEnv runs one environment per worker process. Observations,
+rewards and done flags are written by the workers straight into shared
+memory, so the parent reads them without pickling; only commands and
+small info dicts travel over pipes.
+"""
+
+import functools
+import multiprocessing as mp
+from typing import Callable, Optional, Sequence
+
+import numpy as np
+
+from .gym_env import DinoEnv
+
+# Forwarded info entries and their values when an env leaves one out
+# (DinoEnv reports n_steps only with frame_skip > 1)
+_INFO_DEFAULTS = {"score": 0, "frames": 0, "obstacles_passed": 0, "n_steps": 1}
+
+
+def _info_values(info: dict) -> dict:
+    return {key: info.get(key, default) for key, default in _INFO_DEFAULTS.items()}
+
+
+def _empty_infos(num_envs: int, obs_shape) -> dict:
+    infos = {key: np.full(num_envs, default, dtype=np.int64)
+             for key, default in _INFO_DEFAULTS.items()}
+    infos["final_observation"] = np.zeros((num_envs, *obs_shape), dtype=np.float32)
+    infos["_final"] = np.zeros(num_envs, dtype=bool)
+    return infos
+
+
+class SyncVectorEnv:
+    """Steps a list of environments sequentially in the calling process"""
+
+    def __init__(self, env_fns: Sequence[Callable[[], DinoEnv]]):
+        self.envs = [fn() for fn in env_fns]
+        self.num_envs = len(self.envs)
+        self.single_observation_space = self.envs[0].observation_space
+        self.single_action_space = self.envs[0].action_space
+        self._obs_shape = self.single_observation_space.shape
+
+    def reset(self, *, seed=None, options: Optional[dict] = None):
+        """Reset every environment; an int seed gives env i seed + i"""
+        seeds = _per_env_seeds(seed, self.num_envs)
+        obs = np.zeros((self.num_envs, *self._obs_shape), dtype=np.float32)
+        infos = _empty_infos(self.num_envs, self._obs_shape)
+        for i, env in enumerate(self.envs):
+            obs[i], _ = env.reset(seed=seeds[i], options=options)
+        return obs, infos
+
+    def step(self, actions):
+        obs = np.zeros((self.num_envs, *self._obs_shape), dtype=np.float32)
+        rewards = np.zeros(self.num_envs, dtype=np.float64)
+        terminated = np.zeros(self.num_envs, dtype=bool)
+        truncated = np.zeros(self.num_envs, dtype=bool)
+        infos = _empty_infos(self.num_envs, self._obs_shape)
+
+        for i, env in enumerate(self.envs):
+            obs[i], rewards[i], terminated[i], truncated[i], info = env.step(actions[i])
+            for key, value in _info_values(info).items():
+                infos[key][i] = value
+            if terminated[i] or truncated[i]:
+                infos["final_observation"][i] = obs[i]
+                infos["_final"][i] = True
+                obs[i], _ = env.reset()
+
+        return obs, rewards, terminated, truncated, infos
+
+    def close(self):
+        for env in self.envs:
+            env.close()
+
+
+def _async_worker(index, env_fn, pipe, parent_pipe, shared_obs, shared_rewards,
+                  shared_dones, obs_shape):
+    """Worker process: run one environment, write results into shared memory"""
+    parent_pipe.close()
+    obs_buf = np.frombuffer(shared_obs, dtype=np.float32).reshape(-1, *obs_shape)
+    rewards = np.frombuffer(shared_rewards, dtype=np.float64)
+    dones = np.frombuffer(shared_dones, dtype=np.uint8).reshape(-1, 2)
+
+    env = env_fn()
+    try:
+        while True:
+            command, data = pipe.recv()
+            if command == "reset":
+                obs_buf[index], info = env.reset(seed=data)
+                pipe.send(None)
+            elif command == "step":
+                obs, rewards[index], terminated, truncated, info = env.step(data)
+                dones[index] = (terminated, truncated)
+                final_obs = None
+                if terminated or truncated:
+                    final_obs = obs
+                    obs, _ = env.reset()
+                obs_buf[index] = obs
+                pipe.send((_info_values(info), final_obs))
+            elif command == "close":
+                pipe.send(None)
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        env.close()
+
+
+class AsyncVectorEnv:
+    """
+    Steps environments in parallel worker processes
+
+    Observations live in a shared-memory (num_envs, obs_dim) float32
+    buffer. With copy=False, reset/step return a view of that buffer,
+    which the next step overwrites.
+    """
+
+    def __init__(self, env_fns: Sequence[Callable[[], DinoEnv]], copy: bool = True,
+                 context: str = "spawn"):
+        """
+        Args:
+            env_fns: Picklable callables creating one environment each
+            copy: Return a copy of the shared observation buffer
+            context: multiprocessing start method
+        """
+        self.num_envs = len(env_fns)
+        self.copy = copy
+
+        # Spaces come from a throwaway local instance
+        probe = env_fns[0]()
+        self.single_observation_space = probe.observation_space
+        self.single_action_space = probe.action_space
+        self._obs_shape = self.single_observation_space.shape
+        probe.close()
+
+        ctx = mp.get_context(context)
+        obs_size = self.num_envs * int(np.prod(self._obs_shape))
+        self._shared_obs = ctx.RawArray('f', obs_size)
+        self._shared_rewards = ctx.RawArray('d', self.num_envs)
+        self._shared_dones = ctx.RawArray('B', 2 * self.num_envs)
+        self._obs = np.frombuffer(self._shared_obs, dtype=np.float32).reshape(
+            self.num_envs, *self._obs_shape)
+        self._rewards = np.frombuffer(self._shared_rewards, dtype=np.float64)
+        self._dones = np.frombuffer(self._shared_dones, dtype=np.uint8).reshape(-1, 2)
+
+        self.pipes = []
+        self.processes = []
+        for index, env_fn in enumerate(env_fns):
+            parent_pipe, child_pipe = ctx.Pipe()
+            process = ctx.Process(
+                target=_async_worker,
+                args=(index, env_fn, child_pipe, parent_pipe, self._shared_obs,
+                      self._shared_rewards, self._shared_dones, self._obs_shape),
+                daemon=True
+            )
+            process.start()
+            child_pipe.close()
+            self.pipes.append(parent_pipe)
+            self.processes.append(process)
+        self.closed = False
+
+    def _observations(self):
+        return self._obs.copy() if self.copy else self._obs
+
+    def reset(self, *, seed=None, options: Optional[dict] = None):
+        """Reset every environment; an int seed gives env i seed + i"""
+        for pipe, env_seed in zip(self.pipes, _per_env_seeds(seed, self.num_envs)):
+            pipe.send(("reset", env_seed))
+        for pipe in self.pipes:
+            pipe.recv()
+        return self._observations(), _empty_infos(self.num_envs, self._obs_shape)
+
+    def step_async(self, actions):
+        for pipe, action in zip(self.pipes, actions):
+            pipe.send(("step", int(action)))
+
+    def step_wait(self):
+        infos = _empty_infos(self.num_envs, self._obs_shape)
+        for i, pipe in enumerate(self.pipes):
+            info, final_obs = pipe.recv()
+            for key, value in info.items():
+                infos[key][i] = value
+            if final_obs is not None:
+                infos["final_observation"][i] = final_obs
+                infos["_final"][i] = True
+
+        terminated = self._dones[:, 0].astype(bool)
+        truncated = self._dones[:, 1].astype(bool)
+        return self._observations(), self._rewards.copy(), terminated, truncated, infos
+
+    def step(self, actions):
+        self.step_async(actions)
+        return self.step_wait()
+
+    def close(self):
+        if self.closed:
+            return
+        for pipe in self.pipes:
+            try:
+                pipe.send(("close", None))
+                pipe.recv()
+            except (BrokenPipeError, EOFError):
+                pass
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self.closed = True
+
+    def __del__(self):
+        if not getattr(self, "closed", True):
+            self.close()
+
+
+def _per_env_seeds(seed, num_envs: int):
+    if seed is None:
+        return [None] * num_envs
+    if np.isscalar(seed):
+        return [seed + i for i in range(num_envs)]
+    return list(seed)
+
+
+def make_vector_env(num_envs: int, asynchronous: bool = False, seed: Optional[int] = None,
+                    **env_kwargs):
+    """
+    Build a vector of DinoEnv instances
+
+    Args:
+        num_envs: Number of environments
+        asynchronous: AsyncVectorEnv (subprocesses) instead of SyncVectorEnv
+        seed: Environment i is created with seed + i
+        **env_kwargs: Forwarded to DinoEnv (e.g. max_episode_steps)
+    """
+    env_fns = [functools.partial(DinoEnv, seed=None if seed is None else seed + i, **env_kwargs)
+               for i in range(num_envs)]
+    return AsyncVectorEnv(env_fns) if asynchronous else SyncVectorEnv(env_fns)
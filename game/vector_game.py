@@ -0,0 +1,256 @@
+"""
+Vectorized Dino Jump - N headless games stepped as NumPy arrays
+
+Struct-of-arrays twin of DinoGame: every per-game attribute (dino y /
+velocity, obstacle x / height / passed, speed, counters) lives in one
+array with a leading `num_envs` axis, so a single `step()` call advances
+all games at once.  Physics, collision, reward shaping and obstacle
+spawning follow DinoGame line by line, so game *i* reproduces a scalar
+DinoGame with the same seed exactly.
+"""
+
+import numpy as np
+from .constants import *
+from .dino_game import jump_timing_quality_batch
+
+
+class VectorDinoGame:
+    """
+    N independent Dino games simulated in lockstep (headless only).
+
+    Obstacles are kept in two slots per game: slot 0 is the oldest
+    obstacle and slot 1 the newest.  All obstacles share the game speed,
+    so spawn order is position order and the scalar game never holds
+    more than two obstacles at once.
+
+    Finished games are reset automatically inside `step()`; the state
+    they ended in is returned in `info["final_state"]`.
+    """
+
+    MAX_OBSTACLES = 2
+
+    def __init__(self, num_envs: int, seed=None):
+        """
+        Args:
+            num_envs: Number of games to simulate
+            seed: None, an int (game i uses seed + i) or a sequence of
+                  per-game seeds.  Game i with seed s matches
+                  `DinoGame(render=False, seed=s)`.
+        """
+        self.num_envs = num_envs
+        self._seed_rngs(seed)
+
+        n, k = num_envs, self.MAX_OBSTACLES
+        self.dino_y = np.zeros(n, dtype=np.float64)
+        self.dino_vy = np.zeros(n, dtype=np.float64)
+        self.is_jumping = np.zeros(n, dtype=bool)
+        self.obs_x = np.zeros((n, k), dtype=np.float64)
+        self.obs_height = np.zeros((n, k), dtype=np.int64)
+        self.obs_passed = np.zeros((n, k), dtype=bool)
+        self.obs_count = np.zeros(n, dtype=np.int64)
+        self.speed = np.zeros(n, dtype=np.float64)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.frames_survived = np.zeros(n, dtype=np.int64)
+        self.obstacles_passed = np.zeros(n, dtype=np.int64)
+
+        self.reset()
+
+    def _seed_rngs(self, seed):
+        """Give every game its own numpy.random.Generator"""
+        if seed is None:
+            seeds = [None] * self.num_envs
+        elif np.isscalar(seed):
+            seeds = [seed + i for i in range(self.num_envs)]
+        else:
+            seeds = list(seed)
+            if len(seeds) != self.num_envs:
+                raise ValueError(f"Expected {self.num_envs} seeds, got {len(seeds)}")
+        self._rngs = [np.random.default_rng(s) for s in seeds]
+
+    def reset(self, seed=None):
+        """Reset every game and return the (num_envs, 6) state array
+
+        A seed (same forms as in __init__) re-seeds every game first.
+        """
+        if seed is not None:
+            self._seed_rngs(seed)
+        self._reset_envs(np.arange(self.num_envs))
+        return self.get_state()
+
+    def reset_envs(self, env_ids) -> np.ndarray:
+        """Reset only the selected games (e.g. truncated episodes) and return
+        the full (num_envs, 6) state array"""
+        self._reset_envs(np.asarray(env_ids, dtype=np.int64))
+        return self.get_state()
+
+    def _reset_envs(self, env_ids: np.ndarray):
+        """Reset the selected games in place (mirrors DinoGame.reset)"""
+        self.dino_y[env_ids] = GROUND_Y - DINO_HEIGHT
+        self.dino_vy[env_ids] = 0.0
+        self.is_jumping[env_ids] = False
+        self.obs_passed[env_ids] = False
+        self.obs_count[env_ids] = 0
+        self.speed[env_ids] = OBSTACLE_SPEED_INIT
+        self.score[env_ids] = 0
+        self.frames_survived[env_ids] = 0
+        self.obstacles_passed[env_ids] = 0
+
+        for i in env_ids:
+            self._spawn_obstacle(i)
+
+    def _spawn_obstacle(self, i: int):
+        """Append one obstacle to game i, drawing from its own RNG"""
+        rng = self._rngs[i]
+        count = self.obs_count[i]
+        if count == 0:
+            x = WINDOW_WIDTH
+        else:
+            gap = rng.integers(OBSTACLE_GAP_MIN, OBSTACLE_GAP_MAX + 1)
+            x = self.obs_x[i, count - 1] + gap
+
+        self.obs_x[i, count] = x
+        self.obs_height[i, count] = rng.integers(OBSTACLE_MIN_HEIGHT, OBSTACLE_MAX_HEIGHT + 1)
+        self.obs_passed[i, count] = False
+        self.obs_count[i] = count + 1
+
+    def _valid_mask(self) -> np.ndarray:
+        """(num_envs, MAX_OBSTACLES) mask of occupied obstacle slots"""
+        return np.arange(self.MAX_OBSTACLES) < self.obs_count[:, None]
+
+    def _get_nearest_obstacle(self):
+        """Vectorized DinoGame._get_nearest_obstacle.
+
+        Returns (dist, height) arrays; dist is inf where no obstacle is ahead.
+        """
+        ahead = self._valid_mask() & (self.obs_x + OBSTACLE_WIDTH > DINO_X)
+        dist = np.where(ahead, self.obs_x - (DINO_X + DINO_WIDTH), np.inf)
+        nearest = dist.argmin(axis=1)
+        rows = np.arange(self.num_envs)
+        best_dist = dist[rows, nearest]
+        best_height = np.where(np.isfinite(best_dist),
+                               self.obs_height[rows, nearest], 0)
+        return best_dist, best_height
+
+    def get_state(self) -> np.ndarray:
+        """Vectorized DinoGame.get_state, shape (num_envs, 6)"""
+        state = np.zeros((self.num_envs, 6), dtype=np.float32)
+
+        dist, height = self._get_nearest_obstacle()
+        has_obs = np.isfinite(dist)
+        safe_dist = np.where(has_obs, dist, 0.0)
+
+        state[:, 0] = np.where(has_obs, np.clip(safe_dist / 400, 0, 1), 1.0)
+        urgency = np.where(safe_dist > 0, np.maximum(0, 1 - safe_dist / 150), 1.0)
+        state[:, 1] = np.where(has_obs, urgency, 0.0)
+        state[:, 2] = self.is_jumping
+        state[:, 3] = self.dino_vy / 20.0
+        state[:, 4] = self.speed / OBSTACLE_SPEED_MAX
+        state[:, 5] = height / OBSTACLE_MAX_HEIGHT
+
+        return state
+
+    def step(self, actions):
+        """
+        Advance every game by one frame.
+
+        Args:
+            actions: (num_envs,) array of actions (0 = run, 1 = jump)
+
+        Returns:
+            states, rewards, dones, info - arrays with a leading num_envs
+            axis.  Games that ended are already reset in `states`; their
+            terminal state is in info["final_state"] and their final
+            counters in info["score"] / ["frames"] / ["obstacles_passed"].
+        """
+        actions = np.asarray(actions)
+
+        # Jump (no-op while airborne)
+        jumped_this_frame = (actions == 1) & ~self.is_jumping
+        self.dino_vy[jumped_this_frame] = JUMP_VELOCITY
+        self.is_jumping |= jumped_this_frame
+
+        # Dino physics
+        self.dino_vy += GRAVITY
+        self.dino_y += self.dino_vy
+        landed = self.dino_y >= GROUND_Y - DINO_HEIGHT
+        self.dino_y[landed] = GROUND_Y - DINO_HEIGHT
+        self.dino_vy[landed] = 0.0
+        self.is_jumping[landed] = False
+
+        # Move obstacles
+        valid = self._valid_mask()
+        self.obs_x -= np.where(valid, self.speed[:, None], 0.0)
+
+        # Passed obstacles
+        newly_passed = valid & ~self.obs_passed & (self.obs_x + OBSTACLE_WIDTH < DINO_X)
+        self.obs_passed |= newly_passed
+        passed = newly_passed.sum(axis=1)
+
+        # Remove off-screen: only the oldest obstacle can leave the screen
+        culled = valid[:, 0] & (self.obs_x[:, 0] <= -100)
+        if culled.any():
+            self.obs_x[culled, :-1] = self.obs_x[culled, 1:]
+            self.obs_height[culled, :-1] = self.obs_height[culled, 1:]
+            self.obs_passed[culled, :-1] = self.obs_passed[culled, 1:]
+            self.obs_count[culled] -= 1
+
+        # Update score
+        self.obstacles_passed += passed
+        self.score += passed * 10
+
+        # Spawn new obstacles
+        for i in np.flatnonzero(self.obs_count < self.MAX_OBSTACLES):
+            while self.obs_count[i] < self.MAX_OBSTACLES:
+                self._spawn_obstacle(i)
+
+        # Collision: pygame.Rect truncates to int, colliderect is strict
+        dino_top = np.trunc(self.dino_y)[:, None]
+        obs_left = np.trunc(self.obs_x)
+        obs_top = GROUND_Y - self.obs_height
+        hit = (self._valid_mask()
+               & (DINO_X < obs_left + OBSTACLE_WIDTH)
+               & (dino_top < obs_top + self.obs_height)
+               & (DINO_X + DINO_WIDTH > obs_left)
+               & (dino_top + DINO_HEIGHT > obs_top))
+        collision = hit.any(axis=1)
+
+        rewards = self._calculate_reward(collision, passed, jumped_this_frame)
+
+        # Update speed
+        self.speed = np.minimum(OBSTACLE_SPEED_MAX,
+                                OBSTACLE_SPEED_INIT + self.frames_survived * SPEED_INCREMENT)
+        self.frames_survived += 1
+
+        states = self.get_state()
+        info = {
+            "score": self.score.copy(),
+            "frames": self.frames_survived.copy(),
+            "obstacles_passed": self.obstacles_passed.copy(),
+            "final_state": states,
+        }
+
+        if collision.any():
+            states = states.copy()
+            done_ids = np.flatnonzero(collision)
+            self._reset_envs(done_ids)
+            states[done_ids] = self.get_state()[done_ids]
+
+        return states, rewards, collision, info
+
+    def _calculate_reward(self, collision, passed, jumped_this_frame):
+        """Vectorized DinoGame._calculate_reward"""
+        rewards = np.full(self.num_envs, 0.01, dtype=np.float64)
+
+        if jumped_this_frame.any():
+            dist, obs_height = self._get_nearest_obstacle()
+            quality = jump_timing_quality_batch(dist, obs_height, self.speed)
+            jump_reward = np.where(quality > 0, 0.4 * quality, 0.3 * quality)
+            jump_reward = np.where(dist > 400, -0.3, jump_reward)
+            rewards = np.where(jumped_this_frame, jump_reward, rewards)
+
+        rewards = np.where(passed > 0, 1.0, rewards)
+        rewards = np.where(collision, -1.0, rewards)
+        return rewards
+
+    def close(self):
+        pass
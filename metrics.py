@@ -0,0 +1,138 @@
+"""
+Streaming Training Metrics
+Append-only CSV metrics log with bounded memory and O(1) running averages
+
+train() writes one row per episode through MetricsLogger; nothing is kept
+in memory beyond the running-average window. Plot a log offline with
+plot_metrics.py.
+"""
+
+import csv
+import os
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+class RunningMean:
+    """Mean of the last `window` values, updated in O(1) per value
+
+    Integer inputs (e.g. scores) keep an exact integer running sum, so the
+    mean equals np.mean over the same window bit for bit.
+    """
+
+    def __init__(self, window: int = 100):
+        self.values = deque(maxlen=window)
+        self.total = 0
+
+    def add(self, value) -> float:
+        """Push a value and return the updated window mean"""
+        if len(self.values) == self.values.maxlen:
+            self.total -= self.values[0]
+        self.values.append(value)
+        self.total += value
+        return self.total / len(self.values)
+
+    @property
+    def mean(self) -> float:
+        return self.total / len(self.values) if self.values else 0.0
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class MetricsLogger:
+    """
+    Per-episode metrics sink appending rows to a CSV file
+
+    Rows are buffered by the file object and flushed to disk at most every
+    `flush_interval` seconds (and on flush()/close()), so logging costs
+    no syscall per episode. Memory use is bounded by the score window.
+    """
+
+    def __init__(self, path: str, fields: List[str], window: int = 100,
+                 flush_interval: float = 5.0, resume_upto: Optional[int] = None):
+        """
+        Args:
+            path: CSV file to append to
+            fields: Column names, starting with "episode", "score" and
+                    "avg_score" (the running average, filled in by log())
+            window: Episodes in the running score average
+            flush_interval: Seconds between automatic flushes
+            resume_upto: Continue an existing log, dropping rows after this
+                         episode; None starts a new log
+        """
+        self.path = path
+        self.fields = fields
+        self.flush_interval = flush_interval
+        self.score_window = RunningMean(window)
+        self.episodes = 0
+
+        if resume_upto is not None and os.path.exists(path):
+            self._truncate(resume_upto)
+        else:
+            with open(path, "w", newline="") as f:
+                csv.writer(f).writerow(fields)
+
+        self._file = open(path, "a", newline="")
+        self._writer = csv.writer(self._file)
+        self._last_flush = time.monotonic()
+
+    def _truncate(self, last_episode: int):
+        """Stream the log, keep rows up to last_episode and rebuild the window"""
+        tmp_path = f"{self.path}.tmp"
+        with open(self.path, newline="") as src, open(tmp_path, "w", newline="") as dst:
+            reader = csv.reader(src)
+            writer = csv.writer(dst)
+            writer.writerow(next(reader))
+            for row in reader:
+                if int(row[0]) > last_episode:
+                    break
+                writer.writerow(row)
+                self.score_window.add(int(row[1]))
+                self.episodes += 1
+        os.replace(tmp_path, self.path)
+
+    def log(self, episode: int, score: int, **values) -> float:
+        """
+        Append one episode row
+
+        Args:
+            episode: Episode number
+            score: Episode score (feeds the running average)
+            **values: The remaining fields (missing or None = empty cell)
+
+        Returns:
+            Running average score including this episode
+        """
+        avg_score = self.score_window.add(score)
+        row = [episode, score, repr(avg_score)]
+        for name in self.fields[3:]:
+            value = values.get(name)
+            row.append("" if value is None else repr(float(value)) if isinstance(value, float)
+                       else value)
+        self._writer.writerow(row)
+        self.episodes += 1
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+        return avg_score
+
+    def flush(self):
+        self._file.flush()
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+def read_metrics(path: str) -> Dict[str, np.ndarray]:
+    """Load a metrics log as one float64 array per column (NaN for empty cells)"""
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        fields = next(reader)
+        rows = [[float(v) if v else np.nan for v in row] for row in reader]
+    data = np.array(rows, dtype=np.float64).reshape(-1, len(fields))
+    return {name: data[:, i] for i, name in enumerate(fields)}
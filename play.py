@@ -8,7 +8,6 @@ import argparse
 import pygame
 
 from game import DinoGame
-from agent import DQNAgent
 
 
 def play_with_ai(model_path: str, num_games: int = 5):
@@ -19,6 +18,8 @@ def play_with_ai(model_path: str, num_games: int = 5):
         model_path: Path to trained model
         num_games: Number of games to play
     """
+    from agent import DQNAgent  # torch is only needed when the AI plays
+
     # Initialize game and agent
     # v7.0: 6-dimensional state (added speed + obstacle height)
     game = DinoGame(render=True)
@@ -104,6 +105,8 @@ def compare_ai_human(model_path: str):
     Args:
         model_path: Path to trained model
     """
+    from agent import DQNAgent
+
     print("\n" + "=" * 50)
     print("AI vs Human Comparison Mode")
     print("=" * 50)
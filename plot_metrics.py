@@ -0,0 +1,104 @@
+"""
+Plot Training Metrics
+Offline training curves from a run's metrics.csv (see metrics.py)
+"""
+
+import os
+import argparse
+import numpy as np
+
+from metrics import read_metrics
+
+
+def plot_training_curves(metrics_path: str, output: str = None, show: bool = False,
+                         warmup_episodes: int = 300):
+    """
+    Plot and save training curves
+
+    Args:
+        metrics_path: metrics.csv written by train()
+        output: Image path (default: training_curves.png next to the log)
+        show: Open a window after saving
+        warmup_episodes: Episodes before the peak average is tracked
+    """
+    import matplotlib
+    if not show:
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    metrics = read_metrics(metrics_path)
+    episodes = metrics["episode"]
+    scores = metrics["score"]
+    avg_scores = metrics["avg_score"]
+    loss_rows = ~np.isnan(metrics["loss"])
+
+    # Same markers train() tracks: peak avg after warmup, best avg after 100 episodes
+    peak_avg = 0
+    after_warmup = episodes >= warmup_episodes
+    if after_warmup.any():
+        peak_avg = avg_scores[after_warmup].max()
+    best_avg_ep = 0
+    eligible = episodes >= 100
+    if eligible.any():
+        best_avg_ep = int(episodes[eligible][np.argmax(avg_scores[eligible])])
+
+    fig, axes = plt.subplots(2, 2, figsize=(12, 10))
+
+    # Scores
+    axes[0, 0].plot(episodes, scores, alpha=0.6, label='Score')
+    axes[0, 0].plot(episodes, avg_scores, label='Avg Score (100 ep)')
+    if peak_avg > 0:
+        axes[0, 0].axhline(y=peak_avg, color='r', linestyle='--', alpha=0.5,
+                          label=f'Peak Avg: {peak_avg:.1f}')
+    if best_avg_ep > 0:
+        axes[0, 0].axvline(x=best_avg_ep, color='g', linestyle='--', alpha=0.5,
+                          label=f'Best Avg Ep: {best_avg_ep}')
+    axes[0, 0].set_xlabel('Episode')
+    axes[0, 0].set_ylabel('Score')
+    axes[0, 0].set_title('Training Scores')
+    axes[0, 0].legend()
+    axes[0, 0].grid(True)
+
+    # Loss
+    if loss_rows.any():
+        axes[0, 1].plot(episodes[loss_rows], metrics["loss"][loss_rows])
+        axes[0, 1].set_xlabel('Episode')
+        axes[0, 1].set_ylabel('Loss')
+        axes[0, 1].set_title('Training Loss')
+        axes[0, 1].grid(True)
+
+    # Epsilon
+    axes[1, 0].plot(episodes, metrics["epsilon"])
+    axes[1, 0].set_xlabel('Episode')
+    axes[1, 0].set_ylabel('Epsilon')
+    axes[1, 0].set_title('Exploration Rate')
+    axes[1, 0].grid(True)
+
+    # Score distribution
+    axes[1, 1].hist(scores, bins=30, edgecolor='black')
+    axes[1, 1].set_xlabel('Score')
+    axes[1, 1].set_ylabel('Frequency')
+    axes[1, 1].set_title('Score Distribution')
+    axes[1, 1].grid(True)
+
+    plt.tight_layout()
+    if output is None:
+        output = os.path.join(os.path.dirname(metrics_path), 'training_curves.png')
+    plt.savefig(output, dpi=150)
+    print(f"Training curves saved to {output}")
+    if show:
+        plt.show()
+    plt.close(fig)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Plot Dino Jump training curves')
+    parser.add_argument('metrics', nargs='?', default='model/metrics.csv',
+                       help='Metrics log written by train.py')
+    parser.add_argument('--output', type=str, default=None,
+                       help='Image path (default: next to the log)')
+    parser.add_argument('--show', action='store_true',
+                       help='Open a window after saving')
+
+    args = parser.parse_args()
+    plot_training_curves(args.metrics, output=args.output, show=args.show)
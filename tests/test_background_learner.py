@@ -0,0 +1,40 @@
+"""
+A failing train step on the background learner must not be swallowed
+"""
+
+import numpy as np
+import pytest
+
+from agent.agent import DQNAgent
+
+
+def failing_agent(**kwargs):
+    agent = DQNAgent(6, 2, batch_size=4, seed=0, **kwargs)
+    rng = np.random.default_rng(0)
+    for _ in range(8):
+        agent.store_transition(rng.random(6), 0, 1.0, rng.random(6), False)
+
+    def train_step():
+        raise ValueError("boom")
+
+    agent.train_step = train_step
+    return agent
+
+
+def test_learn_reraises_learner_error():
+    agent = failing_agent()
+    agent.start_background_learner(max_lag=0)
+    with pytest.raises(RuntimeError, match="Background learner failed") as info:
+        agent.learn()
+    assert isinstance(info.value.__cause__, ValueError)
+    agent.stop_background_learner()     # error already reported
+
+
+def test_stop_reraises_learner_error():
+    agent = failing_agent()
+    agent.start_background_learner(max_lag=1000)
+    agent.learn()                       # returns before the step fails
+    agent._learner_thread.join(timeout=10)
+    with pytest.raises(RuntimeError, match="Background learner failed"):
+        agent.stop_background_learner()
+    assert agent._learner_thread is None
@@ -0,0 +1,100 @@
+"""
+A copy-on-write buffer snapshot must equal a state_dict() taken when it began
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from agent.checkpoint import CheckpointWriter, Deferred
+from agent.replay_buffer import ReplayBuffer, PrioritizedReplayBuffer
+
+
+def random_batch(rng, n: int):
+    states = rng.random((n, 4), dtype=np.float32)
+    next_states = np.roll(states, -1, axis=0)
+    next_states[-1] = rng.random(4, dtype=np.float32)
+    return (states, rng.integers(2, size=n), rng.random(n, dtype=np.float32),
+            next_states, rng.random(n) < 0.05, rng.integers(1, 4, size=n))
+
+
+def write(buffer, rng, rounds: int):
+    """Mixed push / push_batch / priority updates"""
+    for _ in range(rounds):
+        batch = random_batch(rng, int(rng.integers(1, 12)))
+        if rng.random() < 0.5:
+            buffer.push_batch(*batch)
+        else:
+            for t in zip(*batch):
+                buffer.push(*t)
+        if isinstance(buffer, PrioritizedReplayBuffer):
+            indices = rng.integers(len(buffer), size=8)
+            buffer.update_priorities(indices, rng.random(8) * 3)
+
+
+def assert_states_equal(actual: dict, expected: dict):
+    assert actual.keys() == expected.keys()
+    for key, value in expected.items():
+        if isinstance(value, np.ndarray):
+            np.testing.assert_array_equal(actual[key], value, err_msg=key)
+        else:
+            assert actual[key] == value, key
+
+
+BUFFERS = [
+    lambda rng: ReplayBuffer(97, rng=rng),
+    lambda rng: ReplayBuffer(97, rng=rng, compact=True),
+    lambda rng: PrioritizedReplayBuffer(97, rng=rng),
+    lambda rng: PrioritizedReplayBuffer(97, rng=rng, compact=True),
+]
+
+
+@pytest.mark.parametrize("make", BUFFERS)
+@pytest.mark.parametrize("seed", range(3))
+def test_snapshot_ignores_later_writes(make, seed):
+    rng = np.random.default_rng(seed)
+    buffer = make(rng)
+    write(buffer, rng, 15)
+    expected = buffer.state_dict()
+
+    snapshot = buffer.begin_snapshot()
+    write(buffer, rng, 10)              # before the copy (wraps the ring)
+    state = buffer.snapshot_state(snapshot)
+    write(buffer, rng, 10)              # after the copy
+    buffer.end_snapshot(snapshot, state)
+
+    assert_states_equal(state, expected)
+    assert not buffer._snapshots
+
+
+@pytest.mark.parametrize("make", BUFFERS)
+def test_loaded_snapshot_restores_priority_trees(make):
+    rng = np.random.default_rng(7)
+    buffer = make(rng)
+    write(buffer, rng, 30)
+    snapshot = buffer.begin_snapshot()
+    state = buffer.snapshot_state(snapshot)
+    buffer.end_snapshot(snapshot, state)
+
+    restored = make(np.random.default_rng(0))
+    restored.load_state_dict(state)
+    assert_states_equal(restored.state_dict(), buffer.state_dict())
+    if isinstance(buffer, PrioritizedReplayBuffer):
+        np.testing.assert_array_equal(restored.sum_tree.tree, buffer.sum_tree.tree)
+        np.testing.assert_array_equal(restored.min_tree.tree, buffer.min_tree.tree)
+
+
+def test_coalesced_deferred_is_cancelled(tmp_path):
+    events = []
+    writer = CheckpointWriter()
+    with writer._cond:              # hold the writer so both saves are pending
+        writer.submit({"x": Deferred(lambda: events.append("first"),
+                                     lambda: events.append("cancel first"))},
+                      os.path.join(tmp_path, "a.pth"))
+        writer.submit({"x": Deferred(lambda: events.append("second") or 2,
+                                     lambda: events.append("cancel second"))},
+                      os.path.join(tmp_path, "a.pth"))
+    writer.close()
+    assert events == ["cancel first", "second"]
+    assert writer.writes == 1
@@ -0,0 +1,130 @@
+"""
+Compact replay storage must return exactly the transitions that were pushed
+"""
+
+import numpy as np
+import pytest
+
+from agent.replay_buffer import ReplayBuffer, PrioritizedReplayBuffer
+from game import DinoGame
+
+
+def transition_chunks(seed: int, num_chunks: int = 150):
+    """Seeded chunks of transitions from 3 interleaved games (episodes
+    end by collision or truncation after 60 decisions)"""
+    rng = np.random.default_rng(seed)
+    games = [DinoGame(render=False, seed=seed + i) for i in range(3)]
+    states = [game.reset() for game in games]
+    lengths = [0] * 3
+    for _ in range(num_chunks):
+        i = int(rng.integers(3))
+        chunk = []
+        for _ in range(int(rng.integers(1, 40))):
+            action = int(rng.random() < 0.1)
+            next_state, reward, done, info = games[i].step_repeat(
+                action, 1 + int(rng.random() < 0.3), 0.9)
+            chunk.append((states[i], action, reward, next_state, done, info["n_steps"]))
+            lengths[i] += 1
+            if done or lengths[i] >= 60:
+                next_state = games[i].reset()
+                lengths[i] = 0
+            states[i] = next_state
+        yield chunk
+
+
+def fill(buffer, seed: int):
+    """Push every chunk (alternating push / push_batch); returns slot -> transition"""
+    stored = {}
+    for n, chunk in enumerate(transition_chunks(seed)):
+        if n % 2:
+            indices = [buffer.push(*t) for t in chunk]
+        else:
+            indices = buffer.push_batch(*(np.array(field) for field in zip(*chunk)))
+        for idx, t in zip(indices, chunk):
+            stored[int(idx)] = t
+    return stored
+
+
+def assert_rows_match(batch, indices, stored):
+    states, actions, rewards, next_states, dones, n_steps = batch[:6]
+    for row, idx in enumerate(indices):
+        state, action, reward, next_state, done, frames = stored[int(idx)]
+        assert np.array_equal(states[row], state)
+        assert np.array_equal(next_states[row], next_state)
+        assert actions[row] == action
+        assert rewards[row] == np.float32(reward)
+        assert dones[row] == done
+        assert n_steps[row] == frames
+
+
+@pytest.mark.parametrize("capacity", [97, 5000])
+def test_gather_matches_pushed(capacity):
+    buffer = ReplayBuffer(capacity, state_size=6, rng=np.random.default_rng(0), compact=True)
+    stored = fill(buffer, seed=1)
+    valid = np.flatnonzero(buffer.valid[:len(buffer)])
+    assert len(valid) == buffer.num_transitions() > 0
+    assert_rows_match(buffer._gather(valid), valid, stored)
+
+    # The out= path gives the same batch
+    batch = buffer._gather(valid)
+    out = tuple(np.empty_like(field) for field in batch)
+    buffer._gather(valid, out)
+    for a, b in zip(out, batch):
+        np.testing.assert_array_equal(a, b)
+
+
+@pytest.mark.parametrize("capacity", [97, 5000])
+def test_sample_matches_plain_buffer(capacity):
+    plain = ReplayBuffer(capacity, state_size=6, rng=np.random.default_rng(0))
+    compact = ReplayBuffer(capacity, state_size=6, rng=np.random.default_rng(0), compact=True)
+    fill(plain, seed=2)
+    fill(compact, seed=2)
+
+    # Every sampled compact row is one of the plain buffer's stored transitions
+    plain_rows = {(s.tobytes(), ns.tobytes(), int(a), float(r), bool(d), int(n))
+                  for s, a, r, ns, d, n in zip(*plain._gather(np.arange(len(plain))))}
+    for _ in range(20):
+        batch = compact.sample(64)
+        for s, a, r, ns, d, n in zip(*batch):
+            assert (s.tobytes(), ns.tobytes(), int(a), float(r), bool(d), int(n)) in plain_rows
+    assert compact.memory_usage()["bytes_per_slot"] < plain.memory_usage()["bytes_per_slot"]
+
+
+@pytest.mark.parametrize("capacity", [97, 5000])
+def test_prioritized_sample_matches_pushed(capacity):
+    buffer = PrioritizedReplayBuffer(capacity, state_size=6, rng=np.random.default_rng(0),
+                                     compact=True)
+    stored = fill(buffer, seed=3)
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        batch = buffer.sample(64, beta=0.4)
+        indices = batch[6]
+        assert buffer.valid[indices].all()
+        assert_rows_match(batch, indices, stored)
+        buffer.update_priorities(indices, rng.random(64))
+
+
+def test_state_dict_round_trip():
+    buffer = ReplayBuffer(300, state_size=6, rng=np.random.default_rng(0), compact=True)
+    fill(buffer, seed=4)
+    restored = ReplayBuffer(300, state_size=6, rng=np.random.default_rng(0), compact=True)
+    restored.load_state_dict(buffer.state_dict())
+    buffer.rng = np.random.default_rng(9)
+    restored.rng = np.random.default_rng(9)
+    for a, b in zip(buffer.sample(64), restored.sample(64)):
+        np.testing.assert_array_equal(a, b)
+
+
+@pytest.mark.parametrize("capacity", [97, 5000])
+def test_push_batch_matches_single_pushes(capacity):
+    single = ReplayBuffer(capacity, state_size=6, compact=True)
+    batched = ReplayBuffer(capacity, state_size=6, compact=True)
+    for chunk in transition_chunks(seed=5):
+        for t in chunk:
+            single.push(*t)
+        batched.push_batch(*(np.array(field) for field in zip(*chunk)))
+        assert len(batched) == len(single)
+        assert batched.position == single.position
+        assert batched.writes == single.writes
+    for name in batched.fields:
+        np.testing.assert_array_equal(getattr(batched, name), getattr(single, name), err_msg=name)
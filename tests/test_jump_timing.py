@@ -0,0 +1,97 @@
+"""
+Jump-timing reward: the cached window table must reproduce the original
+per-call formula bit for bit (scalar and batch forms)
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from game.constants import OBSTACLE_MAX_HEIGHT, OBSTACLE_SPEED_INIT, OBSTACLE_SPEED_MAX
+from game.dino_game import _DANGER_ZONE, jump_timing_quality, jump_timing_quality_batch
+
+# Scheduled speeds plus very low ones, where the distance window collapses
+SPEEDS = np.concatenate([np.linspace(OBSTACLE_SPEED_INIT, OBSTACLE_SPEED_MAX, 41),
+                         [0.25, 0.5, 1.0, 2.0, 3.0, 3.3, 4.0, 12.0]])
+DISTANCES = np.concatenate([np.arange(-50, 801, 7.5), [0.0, 59.0, 60.0, 61.0]])
+
+
+def reference_quality(dist, obs_height, speed):
+    """The formula DinoGame._jump_timing_quality computed inline on every call"""
+    h = max(obs_height, 1)
+    discriminant = 302.76 - 2.4 * h
+    if discriminant <= 0:
+        return -1.0
+
+    sqrt_d = math.sqrt(discriminant)
+    f_first_raw = (17.4 - sqrt_d) / 1.2
+    f_last_raw = (17.4 + sqrt_d) / 1.2
+    margin = h / 25.0
+    first_safe = f_first_raw + margin
+    last_safe = f_last_raw - margin
+    if last_safe <= first_safe:
+        return -1.0
+
+    d_min = first_safe * speed
+    d_max = last_safe * speed - _DANGER_ZONE
+    if d_max <= d_min:
+        d_max = d_min + 1
+
+    d_optimal = (d_min + d_max) / 2.0
+    half_window = (d_max - d_min) / 2.0
+    if half_window < 1:
+        half_window = 1.0
+
+    error = abs(dist - d_optimal) / half_window
+    quality = 1.0 - error
+    return max(-1.0, min(1.0, quality))
+
+
+@pytest.mark.parametrize("height", range(OBSTACLE_MAX_HEIGHT + 1))
+def test_scalar_matches_reference(height):
+    for speed in SPEEDS:
+        for dist in DISTANCES:
+            assert jump_timing_quality(dist, height, speed) == \
+                reference_quality(dist, height, speed), (dist, height, speed)
+
+
+@pytest.mark.parametrize("height", range(OBSTACLE_MAX_HEIGHT + 1))
+def test_batch_matches_reference(height):
+    dist, speed = np.meshgrid(DISTANCES, SPEEDS)
+    expected = np.array([[reference_quality(d, height, s) for d in row_d]
+                         for row_d, s in zip(dist, SPEEDS)])
+    actual = jump_timing_quality_batch(dist, np.full(dist.shape, height), speed)
+    np.testing.assert_array_equal(actual, expected)
+
+
+def test_batch_mixed_heights():
+    rng = np.random.default_rng(0)
+    n = 20000
+    dist = rng.uniform(-50, 800, n)
+    height = rng.integers(0, OBSTACLE_MAX_HEIGHT + 1, n)
+    speed = rng.uniform(0.25, 12, n)
+    expected = [reference_quality(d, int(h), s) for d, h, s in zip(dist, height, speed)]
+    np.testing.assert_array_equal(jump_timing_quality_batch(dist, height, speed), expected)
+
+
+def test_collapsed_distance_window():
+    # Below ~3.3 px/frame the distance window is empty (d_max <= d_min) and
+    # the half-window is clamped to 1 px
+    for height in (0, 1, 30, OBSTACLE_MAX_HEIGHT):
+        for speed in (0.25, 1.0, 3.0):
+            for dist in DISTANCES:
+                assert jump_timing_quality(dist, height, speed) == \
+                    reference_quality(dist, height, speed)
+
+
+@pytest.mark.parametrize("height", [100, 113, 114, 115, 125, 126, 127, 150, 500])
+def test_unclearable_heights(height):
+    # From h = 114 the safety margins close the window (last_safe <= first_safe);
+    # from h = 127 the quadratic has no real root at all
+    for speed in (OBSTACLE_SPEED_INIT, OBSTACLE_SPEED_MAX):
+        for dist in (0.0, 100.0, 300.0):
+            assert jump_timing_quality(dist, height, speed) == \
+                reference_quality(dist, height, speed)
+    if height >= 114:
+        assert jump_timing_quality(100.0, height, OBSTACLE_SPEED_INIT) == -1.0
@@ -0,0 +1,96 @@
+"""
+Sample-time n-step returns must equal a brute-force walk over the pushed
+transitions (episode ends, sequence breaks, write position and ring wrap)
+"""
+
+import numpy as np
+import pytest
+
+from agent.replay_buffer import ReplayBuffer, PrioritizedReplayBuffer
+from game import DinoGame
+
+GAMMA = 0.9
+N_STEP = 4
+
+
+def push_stream(buffer, seed: int, num_chunks: int = 120):
+    """Push seeded chunks from 3 interleaved games; returns (pushed, slot -> push number)"""
+    rng = np.random.default_rng(seed)
+    games = [DinoGame(render=False, seed=seed + i) for i in range(3)]
+    states = [game.reset() for game in games]
+    lengths = [0] * 3
+    pushed, slot_push = [], {}
+    for n in range(num_chunks):
+        i = int(rng.integers(3))
+        chunk = []
+        for _ in range(int(rng.integers(1, 30))):
+            action = int(rng.random() < 0.1)
+            next_state, reward, done, info = games[i].step_repeat(
+                action, 1 + int(rng.random() < 0.3), GAMMA)
+            chunk.append((states[i], action, reward, next_state, done, info["n_steps"]))
+            lengths[i] += 1
+            if done or lengths[i] >= 60:
+                next_state = games[i].reset()
+                lengths[i] = 0
+            states[i] = next_state
+        if n % 2:
+            indices = [buffer.push(*t) for t in chunk]
+        else:
+            indices = buffer.push_batch(*(np.array(field) for field in zip(*chunk)))
+        for idx, t in zip(indices, chunk):
+            slot_push[int(idx)] = len(pushed)
+            pushed.append(t)
+    return pushed, slot_push
+
+
+def reference(pushed, p):
+    """n-step (reward, next_state, done, frames) starting at push p"""
+    reward, frames = 0.0, 0
+    for q in range(p, p + N_STEP):
+        _, _, r, next_state, done, n = pushed[q]
+        reward += GAMMA ** frames * np.float32(r)
+        frames += n
+        if done or q + 1 == len(pushed) or not np.array_equal(pushed[q + 1][0], next_state):
+            break
+    return reward, next_state, done, frames
+
+
+@pytest.mark.parametrize("buffer_cls", [ReplayBuffer, PrioritizedReplayBuffer])
+@pytest.mark.parametrize("compact", [False, True])
+@pytest.mark.parametrize("capacity", [97, 5000])
+def test_matches_brute_force(buffer_cls, compact, capacity):
+    buffer = buffer_cls(capacity, state_size=6, rng=np.random.default_rng(0),
+                        compact=compact, n_step=N_STEP, gamma=GAMMA)
+    pushed, slot_push = push_stream(buffer, seed=capacity)
+    slots = np.flatnonzero(buffer.valid[:len(buffer)]) if compact else np.arange(len(buffer))
+
+    states, actions, rewards, next_states, dones, n_steps = buffer._gather(slots)
+    multi_step = 0
+    for row, slot in enumerate(slots):
+        p = slot_push[int(slot)]
+        reward, next_state, done, frames = reference(pushed, p)
+        assert np.array_equal(states[row], pushed[p][0])
+        assert actions[row] == pushed[p][1]
+        assert rewards[row] == pytest.approx(reward, rel=1e-6, abs=1e-6)
+        assert np.array_equal(next_states[row], next_state)
+        assert dones[row] == done
+        assert n_steps[row] == frames
+        multi_step += frames > pushed[p][5]
+    assert multi_step > len(slots) // 2
+
+    # out= path gives the same batch
+    batch = (states, actions, rewards, next_states, dones, n_steps)
+    out = tuple(np.empty_like(field) for field in batch)
+    buffer._gather(slots, out)
+    for a, b in zip(out, batch):
+        np.testing.assert_array_equal(a, b)
+
+
+def test_one_step_is_unchanged():
+    plain = ReplayBuffer(500, state_size=6, rng=np.random.default_rng(0))
+    one_step = ReplayBuffer(500, state_size=6, rng=np.random.default_rng(0), n_step=1,
+                            gamma=GAMMA)
+    push_stream(plain, seed=7)
+    push_stream(one_step, seed=7)
+    for a, b in zip(plain.sample(64), one_step.sample(64)):
+        np.testing.assert_array_equal(a, b)
@@ -0,0 +1,38 @@
+"""
+A failed train step must hand its prefetched staging slot back
+"""
+
+import threading
+
+import numpy as np
+import pytest
+
+from agent.agent import DQNAgent
+
+
+def test_failed_steps_release_their_slots():
+    agent = DQNAgent(6, 2, batch_size=4, seed=0)
+    rng = np.random.default_rng(0)
+    for _ in range(16):
+        agent.store_transition(rng.random(6), 0, 1.0, rng.random(6), False)
+    agent.start_prefetch(num_batches=2)
+    loss_path = agent._loss_path
+
+    def failing_loss(*parts):
+        raise ValueError("boom")
+
+    def run():
+        agent._loss_path = failing_loss
+        for _ in range(5):          # more failures than staging slots
+            with pytest.raises(ValueError):
+                agent.train_step()
+        agent._loss_path = loss_path
+        result.append(agent.train_step())
+
+    result = []
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(timeout=30)
+    assert not thread.is_alive(), "train_step deadlocked waiting for a free slot"
+    assert isinstance(result[0], float)
+    agent.stop_prefetch()
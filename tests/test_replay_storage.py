@@ -0,0 +1,31 @@
+"""
+A reopened memory-mapped buffer must only sample the transitions its header covers
+"""
+
+import numpy as np
+import pytest
+
+from agent.replay_buffer import PrioritizedReplayBuffer, open_replay_buffer
+
+
+@pytest.mark.parametrize("mode", ["r", "r+"])
+@pytest.mark.parametrize("compact", [False, True])
+def test_reopen_ignores_priorities_after_last_flush(tmp_path, mode, compact):
+    rng = np.random.default_rng(0)
+    buffer = PrioritizedReplayBuffer(1000, state_size=4, storage_dir=str(tmp_path),
+                                     compact=compact)
+    for _ in range(200):
+        buffer.push(rng.random(4), int(rng.integers(2)), 1.0, rng.random(4), False)
+    buffer.flush()
+    flushed = len(buffer)
+    for _ in range(600):           # written to the memmaps, not covered by the header
+        buffer.push(rng.random(4), int(rng.integers(2)), 1.0, rng.random(4), False)
+
+    reopened = open_replay_buffer(str(tmp_path), mode=mode, rng=np.random.default_rng(1))
+    assert len(reopened) == flushed
+    indices = np.concatenate([reopened.sample(256, beta=0.4)[6] for _ in range(20)])
+    assert indices.max() < flushed
+    # Every stored transition has the same priority, so no slot stands out
+    counts = np.bincount(indices, minlength=flushed)
+    assert counts.max() < 0.02 * len(indices)
+    assert reopened.sum_tree.sum() == pytest.approx(reopened.num_transitions())
@@ -0,0 +1,33 @@
+"""
+A seed must give reproducible streams that do not overlap between consumers
+"""
+
+import numpy as np
+import torch
+
+from agent.agent import DQNAgent
+from game import DinoGame
+
+
+def overlaps(a: np.ndarray, b: np.ndarray, max_shift: int = 8) -> bool:
+    """Whether one stream is the other shifted by a few draws"""
+    return any(np.array_equal(a[shift:], b[:len(b) - shift]) or
+               np.array_equal(b[shift:], a[:len(a) - shift])
+               for shift in range(max_shift))
+
+
+def test_agent_streams_are_reproducible_and_independent():
+    a = DQNAgent(6, 2, seed=3)
+    b = DQNAgent(6, 2, seed=3)
+    for p, q in zip(a.policy_net.parameters(), b.policy_net.parameters()):
+        assert torch.equal(p, q)
+    draws = a.rng.integers(1000, size=64)
+    np.testing.assert_array_equal(draws, b.rng.integers(1000, size=64))
+    assert not overlaps(draws, np.random.default_rng(3).integers(1000, size=64))
+
+
+def test_game_and_agent_children_do_not_overlap():
+    agent_seed, game_seed = np.random.SeedSequence(3).spawn(2)
+    game = DinoGame(render=False, seed=game_seed)
+    agent = DQNAgent(6, 2, seed=agent_seed)
+    assert not overlaps(game.rng.integers(1000, size=64), agent.rng.integers(1000, size=64))
@@ -0,0 +1,61 @@
+"""
+DinoGame.step_until_decision must replay exactly the frames step() plays
+"""
+
+import numpy as np
+import pytest
+
+from game import DinoGame
+from game.dino_game import _INERT_DISTANCE
+
+GAMMA = 0.95
+
+
+@pytest.mark.parametrize("max_frames", [None, 7])
+def test_matches_stepwise(max_frames):
+    decisions = frames = 0
+    for seed in range(20):
+        fast = DinoGame(render=False, seed=seed)
+        slow = DinoGame(render=False, seed=seed)
+        rng = np.random.default_rng(seed)
+        done = False
+        while not done:
+            action = int(rng.random() < 0.15)
+            state, reward, done, info = fast.step_until_decision(action, GAMMA, max_frames)
+            k = info["n_steps"]
+            assert max_frames is None or k <= max_frames
+
+            expected = 0.0
+            for j in range(k):
+                slow_state, r, slow_done, slow_info = slow.step(action if j == 0 else 0)
+                expected += GAMMA ** j * r
+                assert not slow_done or j == k - 1
+
+            assert np.array_equal(state, slow_state)
+            assert done == slow_done
+            assert info["score"] == slow_info["score"]
+            assert info["frames"] == slow_info["frames"]
+            assert fast.speed == slow.speed
+            assert [o.x for o in fast.obstacles] == [o.x for o in slow.obstacles]
+            assert reward == pytest.approx(expected, abs=1e-9)
+            decisions += 1
+            frames += k
+    # Several thousand frames, aggregated into far fewer decisions
+    assert frames > 3000
+    assert decisions < frames
+
+
+def test_far_jump_is_inert():
+    for seed in range(10):
+        jumped = DinoGame(render=False, seed=seed)
+        ran = DinoGame(render=False, seed=seed)
+        while jumped._nearest_distance() <= _INERT_DISTANCE + 12:
+            jumped.step(0)
+            ran.step(0)
+        jumped.step(1)
+        ran.step(0)
+        for _ in range(40):
+            state_a, _, done_a, _ = jumped.step(0)
+            state_b, _, done_b, _ = ran.step(0)
+        assert np.array_equal(state_a, state_b)
+        assert done_a == done_b
@@ -0,0 +1,35 @@
+"""
+Vector envs must forward the per-env info entries of DinoEnv.step
+"""
+
+import numpy as np
+import pytest
+
+from game.gym_env import DinoEnv
+from game.vector_env import make_vector_env
+
+
+@pytest.mark.parametrize("asynchronous", [False, True])
+@pytest.mark.parametrize("frame_skip", [1, 3])
+def test_infos_match_single_envs(asynchronous, frame_skip):
+    num_envs = 2
+    vector_env = make_vector_env(num_envs, asynchronous=asynchronous, seed=5,
+                                 frame_skip=frame_skip)
+    envs = [DinoEnv(seed=5 + i, frame_skip=frame_skip) for i in range(num_envs)]
+    try:
+        vector_env.reset()
+        for env in envs:
+            env.reset()
+        rng = np.random.default_rng(0)
+        for _ in range(40):
+            actions = (rng.random(num_envs) < 0.2).astype(np.int64)
+            _, _, _, _, infos = vector_env.step(actions)
+            for i, env in enumerate(envs):
+                _, _, terminated, truncated, info = env.step(actions[i])
+                assert infos["n_steps"][i] == info.get("n_steps", 1) >= 1
+                for key in ("score", "frames", "obstacles_passed"):
+                    assert infos[key][i] == info[key]
+                if terminated or truncated:
+                    env.reset()
+    finally:
+        vector_env.close()
@@ -0,0 +1,52 @@
+"""
+VectorDinoGame must match N independent DinoGames with the same seeds
+"""
+
+import numpy as np
+
+from game import DinoGame, VectorDinoGame
+
+NUM_ENVS = 8
+STEPS = 3000
+
+
+def test_matches_scalar_games():
+    vec = VectorDinoGame(NUM_ENVS, seed=100)
+    games = [DinoGame(render=False, seed=100 + i) for i in range(NUM_ENVS)]
+    np.testing.assert_array_equal(vec.get_state(), np.stack([g.get_state() for g in games]))
+
+    rng = np.random.default_rng(0)
+    episodes = 0
+    for t in range(STEPS):
+        actions = (rng.random(NUM_ENVS) < 0.05).astype(np.int64)
+        states, rewards, dones, info = vec.step(actions)
+        for i, game in enumerate(games):
+            state, reward, done, game_info = game.step(int(actions[i]))
+            assert np.array_equal(state, info["final_state"][i]), (t, i)
+            assert reward == rewards[i], (t, i)
+            assert done == dones[i], (t, i)
+            assert game_info["score"] == info["score"][i], (t, i)
+            if done:
+                episodes += 1
+                assert np.array_equal(game.reset(), states[i]), (t, i)
+    assert episodes > 0
+
+
+def test_reset_with_seed_matches():
+    vec = VectorDinoGame(3, seed=0)
+    vec.step(np.ones(3, dtype=np.int64))
+    states = vec.reset(seed=[7, 8, 9])
+    for i, seed in enumerate((7, 8, 9)):
+        np.testing.assert_array_equal(states[i], DinoGame(render=False, seed=seed).get_state())
+
+
+def test_reset_envs_matches():
+    vec = VectorDinoGame(2, seed=5)
+    games = [DinoGame(render=False, seed=5 + i) for i in range(2)]
+    for _ in range(50):
+        vec.step(np.zeros(2, dtype=np.int64))
+        for game in games:
+            game.step(0)
+    states = vec.reset_envs([1])
+    np.testing.assert_array_equal(states[0], games[0].get_state())
+    np.testing.assert_array_equal(states[1], games[1].reset())
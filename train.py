@@ -20,12 +20,32 @@ References:
 """
 
 import os
+import re
+import functools
 import numpy as np
-import matplotlib.pyplot as plt
 from datetime import datetime
 
 from game import DinoGame
-from agent import DQNAgent
+from agent.checkpoint import CheckpointWriter
+from metrics import MetricsLogger
+
+# Run directory files for resuming (see save_train_state / MetricsLogger)
+TRAIN_STATE_FILE = "train_state.pth"
+METRICS_FILE = "metrics.csv"
+METRIC_FIELDS = ["episode", "score", "avg_score", "epsilon", "loss", "steps"]
+PERIODIC_CHECKPOINT = re.compile(r"model_ep(\d+)\.pth$")
+
+
+def periodic_checkpoints(model_dir: str) -> list:
+    """Existing model_epN.pth files in model_dir, oldest episode first"""
+    if not os.path.isdir(model_dir):
+        return []
+    found = []
+    for name in os.listdir(model_dir):
+        match = PERIODIC_CHECKPOINT.match(name)
+        if match:
+            found.append((int(match.group(1)), os.path.join(model_dir, name)))
+    return [path for _, path in sorted(found)]
 
 
 def train(
@@ -36,27 +56,102 @@ def train(
     model_dir: str = "model",
     use_per: bool = False,
     early_stop_patience: int = 100,     # v6.1: balanced patience
-    early_stop_threshold: float = 0.6   # v6.1: increased from 0.4 (more sensitive)
+    early_stop_threshold: float = 0.6,  # v6.1: increased from 0.4 (more sensitive)
+    num_actors: int = 0,
+    weight_sync_interval: int = 100,
+    train_every: int = 1,
+    gradient_steps: int = 1,
+    learning_starts: int = 0,
+    background_learner: bool = False,
+    fused_forward: bool = False,
+    compile_model: bool = False,
+    seed: int = None,
+    keep_last: int = 5,
+    buffer_dir: str = None,
+    resume: bool = False,
+    plot: bool = False,
+    skip_inert: bool = False,
+    frame_skip: int = 1,
+    compact_buffer: bool = False,
+    n_step: int = 1,
+    prefetch_batches: int = 0
 ):
     """
     Train the DQN agent with anti-forgetting mechanisms
 
     Args:
         num_episodes: Number of training episodes
-        max_steps: Maximum steps per episode
+        max_steps: Maximum steps per episode (agent decisions, not frames,
+                   with skip_inert or frame_skip)
         render: Whether to render the game during training
-        save_freq: How often to save the model
+        save_freq: How often to save the model and train_state.pth. The
+                   replay buffer in train_state.pth (a full copy unless
+                   buffer_dir is set) is copied on the checkpoint thread,
+                   which needs up to its size in extra memory per save
         model_dir: Directory to save models
         use_per: Use Prioritized Experience Replay
         early_stop_patience: Episodes to wait before early stopping
         early_stop_threshold: Stop if avg drops below this ratio of peak
+        num_actors: Actor processes collecting experience in parallel
+                    (0 = single-process collection in the learner)
+        weight_sync_interval: Train steps between policy weight syncs to actors
+        train_every: Env steps between update rounds
+        gradient_steps: Train steps per update round
+        learning_starts: Env steps collected before the first update
+        background_learner: Run train steps on a thread concurrent with env stepping
+        fused_forward: Single policy pass over states + next_states, fused Adam
+        compile_model: Compile the learner's loss path (falls back to eager)
+        seed: Seed for the game(s) and agent, split into independent child
+              seeds (np.random.SeedSequence); the same seed reproduces a run
+              exactly unless actors or the background learner are used
+        keep_last: Periodic model_epN checkpoints to keep (None = all)
+        buffer_dir: Memory-mapped replay storage; an existing buffer there is
+                    reopened, so a restarted run skips re-collecting experience
+        resume: Continue the run in model_dir from its last train_state.pth
+                (written every save_freq episodes). Seeded single-process
+                runs continue exactly as if never interrupted.
+        plot: Save training_curves.png at the end (see plot_metrics.py)
+        skip_inert: Query the agent only on frames where the action can
+                    matter; inert frames are fast-forwarded and stored as one
+                    aggregated transition (single-process collection only).
+                    max_steps and the logged `steps` then count decisions,
+                    so an episode can run for many more frames
+        frame_skip: Repeat each action for this many frames; the transition
+                    stores the discounted reward sum and bootstraps with
+                    gamma ** frames (max_steps then counts decisions)
+        compact_buffer: Store each replay observation once; next_state is
+                        reconstructed by index (about 35% less replay memory)
+        n_step: Learn from n-step returns over this many stored transitions
+                (bootstrapping with gamma ** frames)
+        prefetch_batches: Batches a sampler thread prepares ahead of the
+                          learner (0 = sample synchronously)
+
+    Returns:
+        (agent, metrics) - metrics is the run's MetricsLogger
     """
-    # Create model directory
+    if skip_inert and num_actors > 0:
+        raise ValueError("skip_inert is only supported with single-process collection")
+    if skip_inert and frame_skip > 1:
+        raise ValueError("skip_inert and frame_skip cannot be combined")
+
+    # torch-backed modules load here, not at import (spawned workers re-import this file)
+    import torch
+    from agent import DQNAgent
+    from agent.actor_pool import ActorPool
+
+    # Create model directory; checkpoints are written on a background thread
     os.makedirs(model_dir, exist_ok=True)
+    # On resume, checkpoints from before the restart count towards keep_last
+    checkpoint_writer = CheckpointWriter(
+        keep_last=keep_last, rotated=periodic_checkpoints(model_dir) if resume else None)
+
+    # One child seed per consumer, so game and exploration streams are unrelated
+    agent_seed = game_seed = actors_seed = None
+    if seed is not None:
+        agent_seed, game_seed, actors_seed = np.random.SeedSequence(seed).spawn(3)
 
     # Initialize game and agent
     # v6.1: Clean configuration proven to work
-    game = DinoGame(render=render)
     agent = DQNAgent(
         state_size=6,
         action_size=2,
@@ -70,14 +165,31 @@ def train(
         target_update_freq=100,
         use_double_dqn=True,
         use_per=use_per,            # v6.0: optional PER
-        soft_update=False
+        soft_update=False,
+        train_every=train_every,
+        gradient_steps=gradient_steps,
+        learning_starts=learning_starts,
+        fused_forward=fused_forward,
+        compile_model=compile_model,
+        seed=agent_seed,
+        buffer_dir=buffer_dir,
+        compact_buffer=compact_buffer,
+        n_step=n_step
     )
-
-    # Training metrics
-    scores = []
-    avg_scores = []
-    losses = []
-    epsilons = []
+    if background_learner:
+        agent.start_background_learner()
+
+    # Experience comes from one in-process game, or from K actor processes
+    if num_actors > 0:
+        game = None
+        actor_pool = ActorPool(functools.partial(DinoGame, render=False),
+                               agent.policy_net, num_actors,
+                               epsilon=agent.epsilon, max_steps=max_steps,
+                               seed=actors_seed,
+                               frame_skip=frame_skip, gamma=agent.gamma)
+    else:
+        game = DinoGame(render=render, seed=game_seed)
+        actor_pool = None
 
     # Early stopping settings
     best_score = 0
@@ -87,6 +199,43 @@ def train(
     episodes_since_peak = 0
     early_stopped = False
     warmup_episodes = 300  # v6.0 fix: don't track peak until after warmup
+    last_sync_step = 0
+    completed_episodes = 0
+
+    # Resume from the run directory, or start a fresh metrics log
+    state_path = os.path.join(model_dir, TRAIN_STATE_FILE)
+    metrics_path = os.path.join(model_dir, METRICS_FILE)
+    if resume and os.path.exists(state_path):
+        state = torch.load(state_path, map_location=agent.device, weights_only=False)
+        agent.load_snapshot(state['agent'])
+        agent.load_training_state(state['agent_training'])
+        if game is not None and state['game_rng'] is not None:
+            game.rng.bit_generator.state = state['game_rng']
+        if actor_pool is not None:
+            actor_pool.sync_weights(agent.policy_net)
+            actor_pool.set_epsilon(agent.epsilon)
+
+        counters = state['counters']
+        best_score = counters['best_score']
+        best_avg_score = counters['best_avg_score']
+        best_avg_episode = counters['best_avg_episode']
+        peak_avg_score = counters['peak_avg_score']
+        episodes_since_peak = counters['episodes_since_peak']
+        last_sync_step = counters['last_sync_step']
+        early_stopped = state['early_stopped']
+        completed_episodes = state['episode']
+
+        print(f"Resumed {model_dir} at episode {completed_episodes}")
+    elif resume:
+        print(f"No {TRAIN_STATE_FILE} in {model_dir}, starting a new run")
+
+    # Started after resuming, so no batch is drawn from the pre-resume buffer
+    if prefetch_batches > 0:
+        agent.start_prefetch(prefetch_batches)
+
+    # Streaming metrics: one CSV row per episode, only the 100-episode window in memory
+    metrics = MetricsLogger(metrics_path, METRIC_FIELDS, window=100,
+                            resume_upto=completed_episodes if completed_episodes else None)
 
     print("=" * 60)
     print("Starting Training - Version 6.1 (Clean)")
@@ -96,36 +245,65 @@ def train(
     print(f"Epsilon Decay: 0.995 (v5.0)")
     print(f"Early Stop: warmup={warmup_episodes}, patience={early_stop_patience}")
     print(f"Saves: best_model + best_avg_model (v6.0)")
+    if actor_pool is not None:
+        print(f"Actors: {num_actors} (weight sync every {weight_sync_interval} train steps)")
     print("=" * 60)
 
-    for episode in range(1, num_episodes + 1):
-        state = game.reset()
-        total_reward = 0
-        episode_loss = []
-
-        for step in range(max_steps):
-            # Select action
-            action = agent.select_action(state, training=True)
-
-            # Execute action
-            next_state, reward, done, info = game.step(action)
+    pending_episodes = []
+    start_episode = num_episodes + 1 if early_stopped else completed_episodes + 1
 
-            # Store transition
-            agent.store_transition(state, action, reward, next_state, done)
-
-            # Train
-            loss = agent.train_step()
-            if loss is not None:
-                episode_loss.append(loss)
+    for episode in range(start_episode, num_episodes + 1):
+        episode_loss = []
 
-            total_reward += reward
-            state = next_state
-
-            if done:
-                break
+        if actor_pool is not None:
+            # Learn from streamed actor transitions until an episode finishes
+            while not pending_episodes:
+                batch, finished = actor_pool.get()
+                agent.store_transitions(*batch)
+                pending_episodes.extend(finished)
+
+                episode_loss.extend(agent.learn(len(batch[0])))
+                if agent.steps - last_sync_step >= weight_sync_interval:
+                    actor_pool.sync_weights(agent.policy_net)
+                    last_sync_step = agent.steps
+
+            info, step = pending_episodes.pop(0)
+        else:
+            state = game.reset()
+            total_reward = 0
+
+            for step in range(max_steps):
+                # Select action
+                action = agent.select_action(state, training=True)
+
+                # Execute action (plus any inert frames after it)
+                if skip_inert:
+                    next_state, reward, done, info = game.step_until_decision(action, agent.gamma)
+                    n_steps = info['n_steps']
+                elif frame_skip > 1:
+                    next_state, reward, done, info = game.step_repeat(action, frame_skip,
+                                                                      agent.gamma)
+                    n_steps = info['n_steps']
+                else:
+                    next_state, reward, done, info = game.step(action)
+                    n_steps = 1
+
+                # Store transition
+                agent.store_transition(state, action, reward, next_state, done, n_steps)
+
+                # Train (per the agent's update schedule)
+                episode_loss.extend(agent.learn())
+
+                total_reward += reward
+                state = next_state
+
+                if done:
+                    break
 
         # Decay epsilon
         agent.decay_epsilon()
+        if actor_pool is not None:
+            actor_pool.set_epsilon(agent.epsilon)
 
         # Increase PER beta if using PER
         if use_per:
@@ -133,13 +311,9 @@ def train(
 
         # Record metrics
         score = info['score']
-        scores.append(score)
-        avg_score = np.mean(scores[-100:])  # Average of last 100 episodes
-        avg_scores.append(avg_score)
-        epsilons.append(agent.epsilon)
-
-        if episode_loss:
-            losses.append(np.mean(episode_loss))
+        avg_score = metrics.log(episode, score, epsilon=agent.epsilon, steps=step,
+                                loss=np.mean(episode_loss) if episode_loss else None)
+        completed_episodes = episode
 
         # Print progress
         if episode % 10 == 0:
@@ -153,14 +327,14 @@ def train(
         # Save best score model
         if score > best_score:
             best_score = score
-            agent.save(os.path.join(model_dir, "best_model.pth"))
+            agent.save(os.path.join(model_dir, "best_model.pth"), writer=checkpoint_writer)
             print(f"  -> New best score: {best_score}")
 
         # Save best average score model (v6.0: prevents forgetting)
         if avg_score > best_avg_score and episode >= 100:
             best_avg_score = avg_score
             best_avg_episode = episode
-            agent.save(os.path.join(model_dir, "best_avg_model.pth"))
+            agent.save(os.path.join(model_dir, "best_avg_model.pth"), writer=checkpoint_writer)
             print(f"  -> New best avg score: {best_avg_score:.1f} at episode {episode}")
 
         # Track peak average for early stopping (only after warmup)
@@ -185,18 +359,35 @@ def train(
                 early_stopped = True
                 break
 
-        # Periodic save
+        # Periodic save (model + everything needed to resume)
         if episode % save_freq == 0:
-            agent.save(os.path.join(model_dir, f"model_ep{episode}.pth"))
+            agent.save(os.path.join(model_dir, f"model_ep{episode}.pth"),
+                       writer=checkpoint_writer, rotate=True)
+            metrics.flush()
+            save_train_state(state_path, agent, game, checkpoint_writer, episode, early_stopped,
+                             best_score, best_avg_score, best_avg_episode, peak_avg_score,
+                             episodes_since_peak, last_sync_step)
 
-    # Save final model
-    agent.save(os.path.join(model_dir, "final_model.pth"))
-
-    # Plot training curves
-    plot_training_curves(scores, avg_scores, losses, epsilons, model_dir,
-                        early_stopped, peak_avg_score, best_avg_episode)
+    agent.stop_background_learner()
+    agent.stop_prefetch()
 
-    game.close()
+    # Save final model
+    agent.save(os.path.join(model_dir, "final_model.pth"), writer=checkpoint_writer)
+    save_train_state(state_path, agent, game, checkpoint_writer, completed_episodes,
+                     early_stopped, best_score, best_avg_score, best_avg_episode,
+                     peak_avg_score, episodes_since_peak, last_sync_step)
+    checkpoint_writer.close()
+    metrics.close()
+
+    # Plot training curves (offline: python plot_metrics.py <model_dir>/metrics.csv)
+    if plot:
+        from plot_metrics import plot_training_curves
+        plot_training_curves(metrics_path)
+
+    if actor_pool is not None:
+        actor_pool.close()
+    else:
+        game.close()
     print("\n" + "=" * 60)
     print("Training completed!")
     print(f"Best score: {best_score}")
@@ -207,58 +398,29 @@ def train(
         print("Recommended: Use best_avg_model.pth for best performance")
     print("=" * 60)
 
-    return agent, scores
-
-
-def plot_training_curves(scores, avg_scores, losses, epsilons, save_dir,
-                        early_stopped=False, peak_avg=0, best_avg_ep=0):
-    """Plot and save training curves"""
-    fig, axes = plt.subplots(2, 2, figsize=(12, 10))
-
-    # Scores
-    axes[0, 0].plot(scores, alpha=0.6, label='Score')
-    axes[0, 0].plot(avg_scores, label='Avg Score (100 ep)')
-    if peak_avg > 0:
-        axes[0, 0].axhline(y=peak_avg, color='r', linestyle='--', alpha=0.5,
-                          label=f'Peak Avg: {peak_avg:.1f}')
-    if best_avg_ep > 0:
-        axes[0, 0].axvline(x=best_avg_ep, color='g', linestyle='--', alpha=0.5,
-                          label=f'Best Avg Ep: {best_avg_ep}')
-    axes[0, 0].set_xlabel('Episode')
-    axes[0, 0].set_ylabel('Score')
-    title = 'Training Scores'
-    if early_stopped:
-        title += ' (Early Stopped)'
-    axes[0, 0].set_title(title)
-    axes[0, 0].legend()
-    axes[0, 0].grid(True)
-
-    # Loss
-    if losses:
-        axes[0, 1].plot(losses)
-        axes[0, 1].set_xlabel('Episode')
-        axes[0, 1].set_ylabel('Loss')
-        axes[0, 1].set_title('Training Loss')
-        axes[0, 1].grid(True)
-
-    # Epsilon
-    axes[1, 0].plot(epsilons)
-    axes[1, 0].set_xlabel('Episode')
-    axes[1, 0].set_ylabel('Epsilon')
-    axes[1, 0].set_title('Exploration Rate')
-    axes[1, 0].grid(True)
-
-    # Score distribution
-    axes[1, 1].hist(scores, bins=30, edgecolor='black')
-    axes[1, 1].set_xlabel('Score')
-    axes[1, 1].set_ylabel('Frequency')
-    axes[1, 1].set_title('Score Distribution')
-    axes[1, 1].grid(True)
-
-    plt.tight_layout()
-    plt.savefig(os.path.join(save_dir, 'training_curves.png'), dpi=150)
-    plt.show()
-    print(f"Training curves saved to {save_dir}/training_curves.png")
+    return agent, metrics
+
+
+def save_train_state(path, agent, game, writer, episode, early_stopped, best_score,
+                     best_avg_score, best_avg_episode, peak_avg_score,
+                     episodes_since_peak, last_sync_step):
+    """Queue a resumable snapshot of the run after `episode` on the checkpoint writer"""
+    state = {
+        'episode': episode,
+        'early_stopped': early_stopped,
+        'agent': agent.snapshot(),
+        'agent_training': agent.training_state(deferred=True),
+        'game_rng': None if game is None else game.rng.bit_generator.state,
+        'counters': {
+            'best_score': best_score,
+            'best_avg_score': best_avg_score,
+            'best_avg_episode': best_avg_episode,
+            'peak_avg_score': peak_avg_score,
+            'episodes_since_peak': episodes_since_peak,
+            'last_sync_step': last_sync_step,
+        },
+    }
+    writer.submit(state, path)
 
 
 if __name__ == "__main__":
@@ -267,16 +429,59 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Train DQN agent for Dino Jump v6.1')
     parser.add_argument('--episodes', type=int, default=1000,
                        help='Number of training episodes')
+    parser.add_argument('--max-steps', type=int, default=10000,
+                       help='Maximum steps per episode (decisions with --skip-inert or '
+                            '--frame-skip)')
     parser.add_argument('--render', action='store_true',
                        help='Render game during training')
     parser.add_argument('--save-freq', type=int, default=50,
-                       help='Model save frequency')
+                       help='Model and train state save frequency; each save copies the '
+                            'replay buffer (unless --buffer-dir) on the checkpoint thread')
     parser.add_argument('--per', action='store_true',
                        help='Use Prioritized Experience Replay')
     parser.add_argument('--no-early-stop', action='store_true',
                        help='Disable early stopping')
     parser.add_argument('--patience', type=int, default=200,
                        help='Early stop patience (episodes)')
+    parser.add_argument('--num-actors', type=int, default=0,
+                       help='Actor processes for parallel collection (0 = off)')
+    parser.add_argument('--weight-sync-interval', type=int, default=100,
+                       help='Train steps between weight syncs to actors')
+    parser.add_argument('--train-every', type=int, default=1,
+                       help='Env steps between update rounds')
+    parser.add_argument('--gradient-steps', type=int, default=1,
+                       help='Train steps per update round')
+    parser.add_argument('--learning-starts', type=int, default=0,
+                       help='Env steps collected before the first update')
+    parser.add_argument('--background-learner', action='store_true',
+                       help='Run train steps on a background thread')
+    parser.add_argument('--fused', action='store_true',
+                       help='Fused policy forward pass and Adam step')
+    parser.add_argument('--compile', action='store_true',
+                       help='Compile the loss path (torch.compile / TorchScript)')
+    parser.add_argument('--seed', type=int, default=None,
+                       help='Random seed for reproducible runs')
+    parser.add_argument('--buffer-dir', type=str, default=None,
+                       help='Memory-mapped replay buffer directory (reopened on restart)')
+    parser.add_argument('--model-dir', type=str, default='model',
+                       help='Run directory (checkpoints, metrics, train state)')
+    parser.add_argument('--resume', action='store_true',
+                       help='Resume the run in the model directory')
+    parser.add_argument('--skip-inert', action='store_true',
+                       help='Fast-forward frames where the action cannot matter '
+                            '(--max-steps and the steps metric then count decisions)')
+    parser.add_argument('--prefetch', type=int, default=0,
+                       help='Replay batches prepared ahead on a sampler thread (0 = off)')
+    parser.add_argument('--n-step', type=int, default=1,
+                       help='Transitions per n-step return target')
+    parser.add_argument('--compact-buffer', action='store_true',
+                       help='Store each replay observation once (less memory)')
+    parser.add_argument('--frame-skip', type=int, default=1,
+                       help='Repeat each action for this many frames')
+    parser.add_argument('--plot', action='store_true',
+                       help='Save training_curves.png when training ends')
+    parser.add_argument('--keep-last', type=int, default=5,
+                       help='Periodic checkpoints to keep (0 = keep all)')
 
     args = parser.parse_args()
 
@@ -284,8 +489,28 @@ if __name__ == "__main__":
 
     train(
         num_episodes=args.episodes,
+        max_steps=args.max_steps,
         render=args.render,
         save_freq=args.save_freq,
+        model_dir=args.model_dir,
         use_per=args.per,
-        early_stop_patience=patience
+        early_stop_patience=patience,
+        num_actors=args.num_actors,
+        weight_sync_interval=args.weight_sync_interval,
+        train_every=args.train_every,
+        gradient_steps=args.gradient_steps,
+        learning_starts=args.learning_starts,
+        background_learner=args.background_learner,
+        fused_forward=args.fused,
+        compile_model=args.compile,
+        seed=args.seed,
+        keep_last=args.keep_last or None,
+        buffer_dir=args.buffer_dir,
+        resume=args.resume,
+        plot=args.plot,
+        skip_inert=args.skip_inert,
+        frame_skip=args.frame_skip,
+        compact_buffer=args.compact_buffer,
+        n_step=args.n_step,
+        prefetch_batches=args.prefetch
     )